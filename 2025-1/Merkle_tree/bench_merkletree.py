@@ -0,0 +1,297 @@
+"""
+Benchmarks del árbol de Merkle.
+
+Uso:
+    python bench_merkletree.py build [--sizes 100000 1000000 10000000]
+    python bench_merkletree.py parallel [--workers 4]
+    python bench_merkletree.py verify [--leaves 1000000 --proofs 100000]
+    python bench_merkletree.py persist [--leaves 1000000]
+    python bench_merkletree.py digests [--leaves 200000]
+    python bench_merkletree.py sync [--leaves 1000000 --changes 10 100 1000]
+    python bench_merkletree.py sparse [--keys 100000 --proofs 10000]
+
+En la suite `build` cada medición se ejecuta en un proceso hijo para que el pico
+de memoria (RSS) de un caso no contamine al siguiente.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import merkletree
+
+
+def _peak_rss_kib():
+    """Pico de memoria residente del proceso actual, en KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # En macOS ru_maxrss se expresa en bytes, en Linux en KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _measure_build(size, compact, queue):
+    items = range(size)
+    baseline = _peak_rss_kib()
+    start = time.perf_counter()
+    tree = merkletree.MerkleTree(items, compact=compact)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, _peak_rss_kib() - baseline, tree.root.value.hex()))
+
+
+def _run_isolated(target, *args):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=args + (queue,))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def bench_build(sizes):
+    """Compara tiempo de construcción y memoria entre el modo de nodos y el compacto."""
+    print('{0:>10}  {1:>8}  {2:>10}  {3:>12}'.format('hojas', 'modo', 'tiempo (s)', 'memoria (MiB)'))
+    for size in sizes:
+        roots = set()
+        for compact in (False, True):
+            elapsed, rss_kib, root = _run_isolated(_measure_build, size, compact)
+            roots.add(root)
+            mode = 'compacto' if compact else 'nodos'
+            print('{0:>10}  {1:>8}  {2:>10.2f}  {3:>12.1f}'.format(size, mode, elapsed, rss_kib / 1024))
+        if len(roots) != 1:
+            raise SystemExit('Las raíces no coinciden para {0} hojas.'.format(size))
+
+
+def _timed_build(items, **kwargs):
+    start = time.perf_counter()
+    tree = merkletree.MerkleTree(items, compact=True, **kwargs)
+    return time.perf_counter() - start, tree.root.value
+
+
+def bench_parallel(workers):
+    """Compara la construcción secuencial con hilos y procesos para hojas de 1 KB y 1 MB."""
+    cases = [('1 KB', 1024, 100000), ('1 MB', 1024 * 1024, 512)]
+    print('{0:>6}  {1:>8}  {2:>10}  {3:>10}  {4:>8}'.format('hoja', 'hojas', 'modo', 'tiempo (s)', 'speedup'))
+    with ProcessPoolExecutor(max_workers=workers) as processes:
+        for label, payload, count in cases:
+            items = [os.urandom(payload) for _ in range(count)]
+            serial_time, expected = _timed_build(items)
+            runs = [
+                ('serie', serial_time, expected),
+                ('hilos',) + _timed_build(items, workers=workers),
+                ('procesos',) + _timed_build(items, executor=processes),
+            ]
+            for mode, elapsed, root in runs:
+                if root != expected:
+                    raise SystemExit('La raíz en modo {0} no coincide con la secuencial.'.format(mode))
+                print('{0:>6}  {1:>8}  {2:>10}  {3:>10.2f}  {4:>7.1f}x'.format(
+                    label, count, mode, elapsed, serial_time / elapsed))
+
+
+class _CountingDigest:
+    """Digest SHA-1 que cuenta cuántas veces se invoca."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, element):
+        self.calls += 1
+        return merkletree.sha1_digest(element)
+
+
+def bench_verify(leaves, proofs):
+    """Compara verificar pruebas una a una, en lote y como prueba conjunta."""
+    tree = merkletree.MerkleTree(range(leaves), compact=True)
+    sample = sorted(random.sample(range(leaves), proofs))
+    single = [tree.request_proof(x) for x in sample]
+    multiproof = tree.request_multiproof(sample)
+
+    def one_by_one(digest):
+        return all(merkletree.verify_proof(tree.root, proof, digest) for proof in single)
+
+    cases = [
+        ('una a una', one_by_one, sum(len(p) - 1 for p in single)),
+        ('verify_many', lambda digest: all(merkletree.verify_many(tree.root, single, digest)),
+         sum(len(p) - 1 for p in single)),
+        ('multiproof', lambda digest: merkletree.verify_multiproof(tree.root, multiproof, digest),
+         len(multiproof.hashes)),
+    ]
+    print('{0:>12}  {1:>10}  {2:>12}  {3:>10}'.format('modo', 'tiempo (s)', 'hashes env.', 'digests'))
+    for mode, verify, sent in cases:
+        digest = _CountingDigest()
+        start = time.perf_counter()
+        if not verify(digest):
+            raise SystemExit('La verificación en modo {0} falló.'.format(mode))
+        elapsed = time.perf_counter() - start
+        print('{0:>12}  {1:>10.2f}  {2:>12}  {3:>10}'.format(mode, elapsed, sent, digest.calls))
+
+
+def bench_persist(leaves):
+    """Mide cuánto tarda reabrir un árbol guardado y responder la primera prueba."""
+    tree = merkletree.MerkleTree(range(leaves), compact=True)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'arbol.mrkl')
+        start = time.perf_counter()
+        tree.save(path)
+        save_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = merkletree.MerkleTree.load(path)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        proof = loaded.request_proof(leaves // 2)
+        proof_time = time.perf_counter() - start
+        if not merkletree.verify_proof(tree.root, proof):
+            raise SystemExit('La prueba del árbol cargado no es válida.')
+
+        size_mib = os.path.getsize(path) / 2 ** 20
+        del loaded
+    print('hojas: {0}  archivo: {1:.1f} MiB'.format(leaves, size_mib))
+    print('guardar: {0:.2f} s  cargar: {1:.2f} ms  primera prueba: {2:.2f} ms'.format(
+        save_time, load_time * 1000, proof_time * 1000))
+
+
+def bench_digests(leaves):
+    """Micro-benchmarks por backend: hojas, pares por memoryview vs. concatenación y construcción."""
+    payloads = [os.urandom(64) for _ in range(leaves)]
+    print('{0:>13}  {1:>10}  {2:>11}  {3:>11}  {4:>14}'.format(
+        'backend', 'hojas (s)', 'par mv (s)', 'par + (s)', 'construcción (s)'))
+    for name in sorted(merkletree.DIGEST_BACKENDS):
+        backend = merkletree.get_digest_backend(name)
+        start = time.perf_counter()
+        digests = [backend(x) for x in payloads]
+        leaf_time = time.perf_counter() - start
+
+        packed = bytearray(b''.join(digests))
+        view = memoryview(packed)
+        width = backend.digest_size
+        start = time.perf_counter()
+        for i in range(0, len(packed) - width, 2 * width):
+            backend.pair(view[i:i + width], view[i + width:i + 2 * width])
+        view_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, len(packed) - width, 2 * width):
+            backend(bytes(packed[i:i + width]) + bytes(packed[i + width:i + 2 * width]))
+        concat_time = time.perf_counter() - start
+        view.release()
+
+        start = time.perf_counter()
+        merkletree.MerkleTree(payloads, digest_delegate=backend, compact=True)
+        build_time = time.perf_counter() - start
+        print('{0:>13}  {1:>10.3f}  {2:>11.3f}  {3:>11.3f}  {4:>14.3f}'.format(
+            name, leaf_time, view_time, concat_time, build_time))
+
+
+def _serve_replica(items, sock, queue):
+    queue.put(merkletree.serve_sync(merkletree.MerkleTree(items, compact=True), sock))
+
+
+def bench_sync(leaves, changes):
+    """Reconciliación entre dos procesos unidos por un socketpair, para k hojas distintas."""
+    print('{0:>10}  {1:>8}  {2:>14}  {3:>10}'.format('hojas', 'cambios', 'hashes enviados', 'tiempo (s)'))
+    local = merkletree.MerkleTree(range(leaves), compact=True)
+    for count in changes:
+        items = list(range(leaves))
+        for position in random.sample(range(leaves), count):
+            items[position] = leaves + position
+        client, server = socket.socketpair()
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_serve_replica, args=(items, server, queue))
+        process.start()
+        # La réplica construye su árbol antes de responder; el tiempo incluye esa espera
+        start = time.perf_counter()
+        differing = merkletree.sync_diff(local, client)
+        elapsed = time.perf_counter() - start
+        sent = queue.get()
+        process.join()
+        client.close()
+        server.close()
+        if len(differing) != count:
+            raise SystemExit('Se esperaban {0} hojas distintas y se hallaron {1}.'.format(count, len(differing)))
+        print('{0:>10}  {1:>8}  {2:>14}  {3:>10.2f}'.format(leaves, count, sent, elapsed))
+
+
+def bench_sparse(keys, proofs):
+    """Inserción, pruebas y borrado en el árbol disperso, con la memoria que ocupa."""
+    baseline = _peak_rss_kib()
+    tree = merkletree.SparseMerkleTree()
+    start = time.perf_counter()
+    for key in range(keys):
+        tree.insert(key, key)
+    insert_time = time.perf_counter() - start
+    rss_kib = _peak_rss_kib() - baseline
+
+    sample = random.sample(range(2 * keys), proofs)
+    start = time.perf_counter()
+    generated = [(key, tree.prove(key)) for key in sample]
+    prove_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for key, proof in generated:
+        if not merkletree.verify_sparse_proof(tree.root, key, key if key < keys else None, proof):
+            raise SystemExit('La prueba de la clave {0} no es válida.'.format(key))
+    verify_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in range(0, keys, 2):
+        tree.delete(key)
+    delete_time = time.perf_counter() - start
+    print('claves: {0}  profundidad: {1}  memoria: {2:.1f} MiB'.format(keys, tree.depth, rss_kib / 1024))
+    print('insertar: {0:.1f} us/clave  borrar: {1:.1f} us/clave'.format(
+        insert_time / keys * 1e6, delete_time / ((keys + 1) // 2) * 1e6))
+    print('generar prueba: {0:.1f} us  verificar: {1:.1f} us'.format(
+        prove_time / proofs * 1e6, verify_time / proofs * 1e6))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks del árbol de Merkle.')
+    subparsers = parser.add_subparsers(dest='suite', required=True)
+
+    build = subparsers.add_parser('build', help='Construcción: modo de nodos vs. compacto.')
+    build.add_argument('--sizes', type=int, nargs='+', default=[10 ** 5, 10 ** 6, 10 ** 7])
+
+    parallel = subparsers.add_parser('parallel', help='Construcción secuencial vs. hilos y procesos.')
+    parallel.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    verify = subparsers.add_parser('verify', help='Verificación individual, en lote y multiproof.')
+    verify.add_argument('--leaves', type=int, default=10 ** 6)
+    verify.add_argument('--proofs', type=int, default=10 ** 5)
+
+    persist = subparsers.add_parser('persist', help='Guardado y apertura con mmap.')
+    persist.add_argument('--leaves', type=int, default=10 ** 6)
+
+    digests = subparsers.add_parser('digests', help='Micro-benchmarks de los backends de digest.')
+    digests.add_argument('--leaves', type=int, default=2 * 10 ** 5)
+
+    sync = subparsers.add_parser('sync', help='Reconciliación entre procesos por socket.')
+    sync.add_argument('--leaves', type=int, default=10 ** 6)
+    sync.add_argument('--changes', type=int, nargs='+', default=[10, 100, 1000])
+
+    sparse = subparsers.add_parser('sparse', help='Árbol disperso: inserción, pruebas y borrado.')
+    sparse.add_argument('--keys', type=int, default=10 ** 5)
+    sparse.add_argument('--proofs', type=int, default=10 ** 4)
+
+    args = parser.parse_args(argv)
+    if args.suite == 'build':
+        bench_build(args.sizes)
+    elif args.suite == 'parallel':
+        bench_parallel(args.workers)
+    elif args.suite == 'verify':
+        bench_verify(args.leaves, args.proofs)
+    elif args.suite == 'persist':
+        bench_persist(args.leaves)
+    elif args.suite == 'digests':
+        bench_digests(args.leaves)
+    elif args.suite == 'sync':
+        bench_sync(args.leaves, args.changes)
+    elif args.suite == 'sparse':
+        bench_sparse(args.keys, args.proofs)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,207 @@
+import bisect
 import hashlib
+import mmap
+import os
+import struct
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+# Prueba múltiple: posiciones y digests de las hojas probadas, más los hashes hermanos
+# que el verificador no puede calcular por sí mismo, en el orden en que los consume.
+MultiProof = namedtuple('MultiProof', ['leaf_count', 'positions', 'leaves', 'hashes'])
+
+# Cabecera del formato en disco: firma, versión, tamaño del digest y número de hojas.
+# Le siguen los niveles (de las hojas a la raíz, sin relleno) y el índice de hojas
+# ordenado por digest: registros de (digest, posición como uint64 little-endian).
+_FILE_MAGIC = b'MRKL'
+_FILE_VERSION = 1
+_FILE_HEADER = struct.Struct('<4sHHQ')
+
+
+def _encode_int(element):
+    # Se usa un byte mínimo para enteros pequeños
+    byte_length = (element.bit_length() + 7) // 8 or 1
+    return element.to_bytes(byte_length, byteorder='big')
+
+
+# Conversión a bytes por tipo exacto; evita la cadena de isinstance en el caso común
+_ENCODERS = {
+    bytes: lambda element: element,
+    str: lambda element: element.encode('utf-8'),
+    int: _encode_int,
+}
+
+
+def _encode(element):
+    """
+    Convierte un elemento en los bytes que se hashean: bytes tal cual, cadenas en
+    UTF-8, enteros con el mínimo de bytes y cualquier otro valor mediante `str`.
+    """
+    encoder = _ENCODERS.get(type(element))
+    if encoder is not None:
+        return encoder(element)
+    # Subclases (por ejemplo bool) conservan las reglas de su tipo base
+    if isinstance(element, bytes):
+        return element
+    if isinstance(element, str):
+        return element.encode('utf-8')
+    if isinstance(element, int):
+        return _encode_int(element)
+    # Fallback: convertir a cadena y codificar
+    return str(element).encode('utf-8')
+
+
+class DigestBackend:
+    """
+    Función digest con nombre basada en `hashlib`.
+
+    Se usa como `digest_delegate`: al llamarla con un elemento devuelve su hash.
+    Además ofrece `pair`, que hashea dos digests hijos pasándolos por separado a
+    `update`, de modo que los nodos internos se calculan desde `memoryview` sin
+    crear el bytes concatenado.
+    """
+
+    def __init__(self, name, algorithm, copy_state=False, digest_size=None):
+        """
+        Args:
+            name (str): Nombre con el que se registra el backend.
+            algorithm (str): Algoritmo de `hashlib` (sha1, sha256, blake2b, ...).
+            copy_state (bool): Si es True, se crea un objeto hash una sola vez y cada
+                               cálculo parte de una copia (`copy()`) de ese estado.
+            digest_size (int): Tamaño del digest para algoritmos configurables (blake2b).
+        """
+        self.name = name
+        self.algorithm = algorithm
+        self.copy_state = copy_state
+        kwargs = {} if digest_size is None else {'digest_size': digest_size}
+        constructor = partial(getattr(hashlib, algorithm), **kwargs)
+        self.__new = constructor().copy if copy_state else constructor
+        self.digest_size = constructor().digest_size
+        self.__kwargs = kwargs
+
+    def __call__(self, element):
+        H = self.__new()
+        H.update(_encode(element))
+        return H.digest()
+
+    def pair(self, left, right):
+        """Hash de la concatenación de dos digests (bytes o memoryview) sin copiarlos."""
+        H = self.__new()
+        H.update(left)
+        H.update(right)
+        return H.digest()
+
+    def __reduce__(self):
+        # Los objetos de hashlib no se serializan; se reconstruye a partir de su configuración
+        return (DigestBackend, (self.name, self.algorithm, self.copy_state, self.__kwargs.get('digest_size')))
+
+    def __repr__(self):
+        return 'DigestBackend({0!r})'.format(self.name)
+
+
+DIGEST_BACKENDS = {
+    'sha1': DigestBackend('sha1', 'sha1'),
+    'sha1-copy': DigestBackend('sha1-copy', 'sha1', copy_state=True),
+    'sha256': DigestBackend('sha256', 'sha256'),
+    'sha256-copy': DigestBackend('sha256-copy', 'sha256', copy_state=True),
+    # BLAKE2b con digest de 32 bytes, el tamaño habitual en árboles de Merkle
+    'blake2b': DigestBackend('blake2b', 'blake2b', digest_size=32),
+    'blake2b-copy': DigestBackend('blake2b-copy', 'blake2b', copy_state=True, digest_size=32),
+}
+
+# Función digest por defecto del árbol (SHA-1), igual que la implementación original
+sha1_digest = DIGEST_BACKENDS['sha1']
+
+
+def get_digest_backend(name):
+    """
+    Devuelve el backend registrado con ese nombre.
+
+    Throws:
+        ValueError: Si el nombre no corresponde a ningún backend.
+    """
+    try:
+        return DIGEST_BACKENDS[name]
+    except KeyError:
+        raise ValueError('Backend de digest desconocido: {0}. Disponibles: {1}'.format(
+            name, ', '.join(sorted(DIGEST_BACKENDS)))) from None
+
+
+def _resolve_digest(digest_delegate):
+    """Acepta None (SHA-1), el nombre de un backend o cualquier función digest."""
+    if digest_delegate is None:
+        return sha1_digest
+    if isinstance(digest_delegate, str):
+        return get_digest_backend(digest_delegate)
+    return digest_delegate
+
+
+def _pair_hasher(digest):
+    """
+    Función que hashea dos digests hijos. Usa `pair` si el digest lo ofrece; si no,
+    llama al digest con la concatenación, como hacía el árbol original.
+    """
+    pair = getattr(digest, 'pair', None)
+    if pair is not None:
+        return pair
+    return lambda left, right: digest(b''.join((left, right)))
+
+
+def _level_sizes(leaf_count):
+    """Tamaño de cada nivel, de las hojas a la raíz, para un árbol de `leaf_count` hojas."""
+    sizes = [leaf_count]
+    # El nivel de hojas siempre se combina, incluso con un único elemento
+    while len(sizes) == 1 or sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def _diff_levels(local_sizes, local_digest, remote_sizes, fetch_remote):
+    """
+    Posiciones de las hojas que difieren entre dos árboles.
+
+    Se parte del nivel más alto que existe en ambos y solo se desciende por los
+    subárboles cuyo hash no coincide, así que el costo es O(k log n) para k hojas
+    distintas. `fetch_remote(level, positions)` devuelve los digests remotos de esas
+    posiciones. Las hojas que solo existen en el árbol más grande también cuentan
+    como distintas.
+    """
+    level = min(len(local_sizes), len(remote_sizes)) - 1
+    frontier = list(range(min(local_sizes[level], remote_sizes[level])))
+    differing = []
+    while frontier:
+        remote = fetch_remote(level, frontier)
+        changed = [p for p, digest in zip(frontier, remote) if local_digest(level, p) != digest]
+        if level == 0:
+            differing = changed
+            break
+        level -= 1
+        limit = min(local_sizes[level], remote_sizes[level])
+        frontier = [c for p in changed for c in (2 * p, 2 * p + 1) if c < limit]
+
+    differing.extend(range(min(local_sizes[0], remote_sizes[0]), max(local_sizes[0], remote_sizes[0])))
+    return differing
+
+
+def _digest_items(digest, items):
+    """Aplica el digest a un bloque de elementos (tarea de un worker)."""
+    return [digest(x) for x in items]
+
+
+def _digest_pairs(digest, width, packed):
+    """
+    Calcula los padres de un bloque de digests concatenados de ancho `width`.
+    Si el bloque tiene tamaño impar, el último digest se empareja consigo mismo.
+    """
+    pair = _pair_hasher(digest)
+    view = memoryview(packed)
+    digests = [view[i:i + width] for i in range(0, len(packed), width)]
+    if len(digests) % 2 != 0:
+        digests.append(digests[-1])
+    return [pair(digests[i], digests[i + 1]) for i in range(0, len(digests), 2)]
+
 
 class MerkleTree:
     """
@@ -38,46 +241,203 @@ class MerkleTree:
             return self.__str__() + '\n\t' + (self.left.__repr__() if self.left else 'None') + \
                    '\n\t' + (self.right.__repr__() if self.right else 'None')
 
-    def __init__(self, iterable, digest_delegate=None):
+    class __DigestLevel:
+        """
+        Nivel del árbol en modo compacto: todos los digests del nivel se guardan
+        uno tras otro en un único `bytearray`, con un ancho fijo por digest.
+        Evita crear un objeto Python por cada hash.
+        """
+        __slots__ = ('width', 'buffer')
+
+        def __init__(self, width, buffer=None):
+            self.width = width
+            self.buffer = bytearray() if buffer is None else buffer
+
+        def __len__(self):
+            return len(self.buffer) // self.width
+
+        def __getitem__(self, index):
+            start = index * self.width
+            return bytes(self.buffer[start:start + self.width])
+
+        def __setitem__(self, index, digest):
+            start = index * self.width
+            self.buffer[start:start + self.width] = digest
+
+        def append(self, digest):
+            if len(digest) != self.width:
+                raise Exception('Todos los digests deben tener el mismo tamaño en modo compacto.')
+            self.buffer += digest
+
+    class __LevelNode:
+        """
+        Vista perezosa de un nodo en modo compacto. Expone la misma interfaz que
+        `__Node` (`value`, `left`, `right`), pero calcula los hijos a partir de los
+        niveles en lugar de guardar referencias.
+        """
+        __slots__ = ('_levels', '_level', '_index')
+
+        def __init__(self, levels, level, index):
+            self._levels = levels
+            self._level = level
+            self._index = index
+
+        @property
+        def value(self):
+            return self._levels[self._level][self._index]
+
+        @property
+        def left(self):
+            if self._level == 0:
+                return None
+            return type(self)(self._levels, self._level - 1, 2 * self._index)
+
+        @property
+        def right(self):
+            if self._level == 0:
+                return None
+            # En un nivel impar el último nodo se empareja consigo mismo
+            index = 2 * self._index + 1
+            if index >= len(self._levels[self._level - 1]):
+                index -= 1
+            return type(self)(self._levels, self._level - 1, index)
+
+        def __str__(self):
+            return 'Value: {0}'.format(self.value)
+
+    def __init__(self, iterable, digest_delegate=None, compact=False, workers=None, executor=None):
         """
         Constructor del árbol de Merkle.
 
         Args:
             iterable (iterable): Colección a partir de la cual se construye el árbol.
-            digest_delegate (function): Función que recibe un elemento y devuelve su hash.
+            digest_delegate (function): Función que recibe un elemento y devuelve su hash,
+                                          o el nombre de un backend de `DIGEST_BACKENDS`.
                                           Si no se especifica, se usa SHA-1.
+            compact (bool): Si es True, cada nivel se guarda como un bloque contiguo de
+                            digests en lugar de un objeto `__Node` por hash.
+            workers (int): Si se indica, la construcción reparte el hashing de hojas y de
+                           cada nivel en bloques sobre un pool de ese número de hilos.
+            executor (Executor): Pool propio (por ejemplo un `ProcessPoolExecutor`) para
+                                 la construcción. Con procesos, `digest_delegate` debe
+                                 poder serializarse con pickle.
         """
-        if digest_delegate is None:
-            digest_delegate = self.__sha1_digest
-        self.digest = digest_delegate
+        self.digest = _resolve_digest(digest_delegate)
+        self.__pair = _pair_hasher(self.digest)
+        self.compact = compact
+        self.workers = workers
+        self.executor = executor
+        self.__levels = []
+        self.__readonly = False
         self.__root = self.build_root(iterable)
 
     @property
     def root(self):
         return self.__root
 
-    def __sha1_digest(self, element):
+    @classmethod
+    def from_stream(cls, iterable, digest_delegate=None):
         """
-        Función digest utilizando SHA-1.
+        Calcula la raíz de una colección a medida que se recorre, sin materializarla.
 
         Args:
-            element: Puede ser un entero, cadena o bytes.
+            iterable (iterable): Elementos a resumir (puede ser un generador).
+            digest_delegate (function): Función digest; por defecto SHA-1.
         Returns:
-            bytes: El valor hash en formato bytes.
-        """
-        H = hashlib.sha1()
-        if isinstance(element, bytes):
-            H.update(element)
-        elif isinstance(element, str):
-            H.update(element.encode('utf-8'))
-        elif isinstance(element, int):
-            # Se usa un byte mínimo para enteros pequeños
-            byte_length = (element.bit_length() + 7) // 8 or 1
-            H.update(element.to_bytes(byte_length, byteorder='big'))
-        else:
-            # Fallback: convertir a cadena y codificar
-            H.update(str(element).encode('utf-8'))
-        return H.digest()
+            MerkleStream: Constructor incremental con la raíz en `root`.
+        """
+        stream = MerkleStream(digest_delegate)
+        stream.extend(iterable)
+        return stream
+
+    @classmethod
+    def from_file(cls, path, chunk_size=64 * 1024, digest_delegate=None):
+        """
+        Calcula la raíz de un archivo tomando cada bloque de `chunk_size` bytes como hoja.
+
+        Args:
+            path (str): Ruta del archivo.
+            chunk_size (int): Tamaño en bytes de cada hoja.
+            digest_delegate (function): Función digest; por defecto SHA-1.
+        Returns:
+            MerkleStream: Constructor incremental con la raíz en `root`.
+        """
+        with open(path, 'rb') as fp:
+            return cls.from_stream(iter(partial(fp.read, chunk_size), b''), digest_delegate)
+
+    def save(self, path):
+        """
+        Guarda el árbol en un archivo binario que `load` puede abrir sin recalcular nada.
+
+        Además de los niveles se escribe el índice de hojas ordenado por digest, para
+        que el árbol cargado responda `contains` y `request_proof` con búsqueda binaria.
+
+        Args:
+            path (str): Ruta del archivo de destino.
+        """
+        leaf_count = len(self.__levels[0])
+        width = len(self.__value(0, 0))
+        order = sorted(range(leaf_count), key=lambda position: (self.__value(0, position), position))
+        with open(path, 'wb') as fp:
+            fp.write(_FILE_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, width, leaf_count))
+            for level in self.__levels:
+                if self.compact:
+                    fp.write(level.buffer)
+                else:
+                    fp.write(self.__pack(level, 0, len(level)))
+            for position in order:
+                fp.write(self.__value(0, position))
+                fp.write(position.to_bytes(8, byteorder='little'))
+
+    @classmethod
+    def load(cls, path, digest_delegate=None):
+        """
+        Abre un árbol guardado con `save` mediante `mmap`, sin copiar ni rehashear.
+
+        Los niveles y el índice se leen directamente del archivo mapeado, así que el
+        costo de apertura no depende del número de hojas. El árbol resultante está en
+        modo compacto y es de solo lectura.
+
+        Args:
+            path (str): Ruta del archivo.
+            digest_delegate (function): Función digest con la que se construyó el árbol;
+                                          por defecto SHA-1.
+        Returns:
+            MerkleTree: Árbol respaldado por el archivo.
+        Throws:
+            Exception: Si el archivo no tiene el formato esperado.
+        """
+        digest_delegate = _resolve_digest(digest_delegate)
+        with open(path, 'rb') as fp:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(mapped)
+
+        magic, version, width, leaf_count = _FILE_HEADER.unpack_from(buffer)
+        if magic != _FILE_MAGIC or version != _FILE_VERSION:
+            raise Exception('El archivo no contiene un árbol de Merkle válido.')
+        if len(digest_delegate(b'')) != width:
+            raise Exception('La función digest no coincide con el tamaño de digest del archivo.')
+
+        offset = _FILE_HEADER.size
+        levels = []
+        for size in _level_sizes(leaf_count):
+            levels.append(cls.__DigestLevel(width, buffer[offset:offset + size * width]))
+            offset += size * width
+        if len(buffer) != offset + leaf_count * (width + 8):
+            raise Exception('El archivo del árbol de Merkle está truncado o dañado.')
+
+        tree = cls.__new__(cls)
+        tree.digest = digest_delegate
+        tree.__pair = _pair_hasher(digest_delegate)
+        tree.compact = True
+        tree.workers = None
+        tree.executor = None
+        tree.__levels = levels
+        tree.__index = _SortedLeafIndex(buffer[offset:], width)
+        tree.__duplicates = set()
+        tree.__readonly = True
+        tree.__update_root()
+        return tree
 
     def build_root(self, iterable):
         """
@@ -93,32 +453,249 @@ class MerkleTree:
         if len(collection) == 0:
             raise Exception("La colección no puede estar vacía.")
 
-        # Si la cantidad de elementos es impar, se duplica el último para formar un par.
-        if len(collection) % 2 != 0:
-            collection.extend(collection[-1:])
-
-        # Crear nodos hoja usando el digest aplicado a cada elemento
-        collection = [self.__Node(self.digest(x)) for x in collection]
-        return self.__build_root(collection)
-
-    def __build_root(self, collection):
-        size = len(collection)
-        if size == 1:
-            return collection[0]
-
-        # Si es impar, se duplica el último nodo para tener pares completos
-        if size % 2 != 0:
-            collection.append(self.__Node(collection[-1].value, left=collection[-1].left, right=collection[-1].right))
-
-        next_level = []
-        i = 0
-        while i < size:
-            # Concatenar los valores hash de los dos nodos y aplicar la función digest
-            digest = self.digest(collection[i].value + collection[i+1].value)
-            node = self.__Node(digest, left=collection[i], right=collection[i+1])
-            next_level.append(node)
-            i += 2
-        return self.__build_root(next_level)
+        self.__index = None
+        self.__duplicates = set()
+        if self.executor is not None:
+            self.__build_parallel(collection, self.executor)
+        elif self.workers:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                self.__build_parallel(collection, executor)
+        else:
+            self.__levels = [self.__build_leaves(collection)]
+            self.__rehash(0, len(collection) - 1)
+        return self.__root
+
+    def __build_parallel(self, collection, executor):
+        """
+        Construye el árbol repartiendo el hashing en bloques sobre `executor`.
+
+        `executor.map` conserva el orden de los bloques, por lo que el resultado es
+        idéntico al de la construcción secuencial. Los bloques de cada nivel empiezan
+        en una posición par, así que solo el último puede quedar con tamaño impar.
+        """
+        parts = 4 * (self.workers or os.cpu_count() or 1)
+        size = -(-len(collection) // parts)
+        chunks = [collection[i:i + size] for i in range(0, len(collection), size)]
+        digests = [d for chunk in executor.map(partial(_digest_items, self.digest), chunks) for d in chunk]
+        self.__levels = [self.__level_from_digests(None, digests)]
+
+        level = self.__levels[0]
+        while len(self.__levels) == 1 or len(level) > 1:
+            width = len(self.__value(len(self.__levels) - 1, 0))
+            pairs = -(-len(level) // 2)
+            step = 2 * -(-pairs // parts)
+            chunks = [self.__pack(level, i, i + step) for i in range(0, len(level), step)]
+            task = partial(_digest_pairs, self.digest, width)
+            digests = [d for chunk in executor.map(task, chunks) for d in chunk]
+            level = self.__level_from_digests(level, digests)
+            self.__levels.append(level)
+        self.__update_root()
+
+    def __pack(self, level, start, stop):
+        """Concatena en un solo bytes los digests de `level` en el rango [start, stop)."""
+        if self.compact:
+            return bytes(level.buffer[start * level.width:stop * level.width])
+        return b''.join(node.value for node in level[start:stop])
+
+    def __level_from_digests(self, lower, digests):
+        """
+        Crea un nivel a partir de sus digests ya calculados. `lower` es el nivel
+        inferior (None para las hojas) y se usa para enlazar los hijos en modo nodos.
+        """
+        if self.compact:
+            width = len(digests[0])
+            level = self.__DigestLevel(width, bytearray(b''.join(digests)))
+            if len(level.buffer) != width * len(digests):
+                raise Exception('Todos los digests deben tener el mismo tamaño en modo compacto.')
+            return level
+        if lower is None:
+            return [self.__Node(digest) for digest in digests]
+
+        level = []
+        for position, digest in enumerate(digests):
+            left = lower[2 * position]
+            if 2 * position + 1 < len(lower):
+                right = lower[2 * position + 1]
+            else:
+                right = self.__Node(left.value, left=left.left, right=left.right)
+            level.append(self.__Node(digest, left=left, right=right))
+        return level
+
+    def __build_leaves(self, collection):
+        """Crea el nivel de hojas aplicando el digest a cada elemento."""
+        if not self.compact:
+            return [self.__Node(self.digest(x)) for x in collection]
+
+        digests = (self.digest(x) for x in collection)
+        first = next(digests)
+        level = self.__DigestLevel(len(first))
+        level.append(first)
+        for digest in digests:
+            level.append(digest)
+        return level
+
+    def __new_level(self):
+        if self.compact:
+            return self.__DigestLevel(self.__levels[0].width)
+        return []
+
+    def __parent(self, level, i, view=None):
+        """
+        Calcula el padre del par que empieza en la posición par `i` de `level`.
+
+        Los niveles se guardan sin relleno: si el nivel tiene tamaño impar, el último
+        nodo se empareja consigo mismo (el nodo duplicado del árbol original). En modo
+        compacto los hijos se leen como slices de `view`, una memoryview del nivel.
+        """
+        if self.compact:
+            width = level.width
+            start = i * width
+            right = start + width if i + 1 < len(level) else start
+            return self.__pair(view[start:start + width], view[right:right + width])
+
+        left = level[i]
+        if i + 1 < len(level):
+            right = level[i + 1]
+        else:
+            # Si es impar, se duplica el último nodo para tener pares completos
+            right = self.__Node(left.value, left=left.left, right=left.right)
+        # Concatenar los valores hash de los dos nodos y aplicar la función digest
+        return self.__Node(self.__pair(left.value, right.value), left=left, right=right)
+
+    def __rehash(self, start, stop):
+        """
+        Recalcula los ancestros de las hojas en el rango [start, stop].
+
+        Solo se tocan los padres de ese rango en cada nivel, de modo que una
+        actualización cuesta O(log n) y una construcción completa O(n). Si el nivel
+        superior deja de tener un único nodo, se añade un nuevo nivel.
+        """
+        levels = self.__levels
+        level = 0
+        # El nivel de hojas siempre se combina, incluso con un único elemento
+        while level == 0 or len(levels[level]) > 1:
+            if level + 1 == len(levels):
+                levels.append(self.__new_level())
+            lower, upper = levels[level], levels[level + 1]
+            start, stop = start // 2, stop // 2
+            view = memoryview(lower.buffer) if self.compact else None
+            for position in range(start, stop + 1):
+                parent = self.__parent(lower, 2 * position, view)
+                if position < len(upper):
+                    upper[position] = parent
+                else:
+                    upper.append(parent)
+            if view is not None:
+                view.release()
+            level += 1
+        self.__update_root()
+
+    def __update_root(self):
+        top = len(self.__levels) - 1
+        if self.compact:
+            self.__root = self.__LevelNode(self.__levels, top, 0)
+        else:
+            self.__root = self.__levels[top][0]
+
+    def __set_leaf(self, position, item):
+        """Guarda el digest de `item` en la hoja `position` y mantiene el índice al día."""
+        digest = self.digest(item)
+        leaves = self.__levels[0]
+        if position < len(leaves):
+            self.__forget_leaf(position)
+            leaves[position] = digest if self.compact else self.__Node(digest)
+        else:
+            leaves.append(digest if self.compact else self.__Node(digest))
+
+        if self.__index is not None:
+            if digest in self.__index:
+                self.__duplicates.add(digest)
+                self.__index[digest] = min(self.__index[digest], position)
+            else:
+                self.__index[digest] = position
+
+    def __forget_leaf(self, position):
+        """Quita del índice la hoja que va a ser reemplazada."""
+        if self.__index is None:
+            return
+        digest = self.__value(0, position)
+        if digest in self.__duplicates:
+            # Otra hoja podría compartir el digest: el índice se reconstruye en la próxima consulta
+            self.__index = None
+            self.__duplicates = set()
+        elif self.__index.get(digest) == position:
+            del self.__index[digest]
+
+    def append(self, item):
+        """
+        Añade un elemento al final del árbol recalculando solo su rama, en O(log n).
+
+        Args:
+            item: Elemento a añadir.
+        """
+        self.extend([item])
+
+    def extend(self, items):
+        """
+        Añade varios elementos al final del árbol. Los padres de las hojas nuevas se
+        recalculan una sola vez por nivel.
+
+        Args:
+            items (iterable): Elementos a añadir.
+        """
+        self.__check_writable()
+        start = len(self.__levels[0])
+        for item in items:
+            self.__set_leaf(len(self.__levels[0]), item)
+        stop = len(self.__levels[0]) - 1
+        if stop >= start:
+            self.__rehash(start, stop)
+
+    def update(self, index, item):
+        """
+        Reemplaza el elemento en la posición `index` recalculando solo su rama, en O(log n).
+
+        Args:
+            index (int): Posición de la hoja a reemplazar.
+            item: Nuevo elemento.
+        Throws:
+            IndexError: Si la posición no existe en el árbol.
+        """
+        self.__check_writable()
+        size = len(self.__levels[0])
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('La posición {0} no existe en el árbol.'.format(index))
+        self.__set_leaf(index, item)
+        self.__rehash(index, index)
+
+    def __check_writable(self):
+        if self.__readonly:
+            raise Exception('El árbol cargado desde disco es de solo lectura.')
+
+    def __value(self, level, index):
+        """Digest del nodo en la posición `index` del nivel `level`."""
+        node = self.__levels[level][index]
+        return node if self.compact else node.value
+
+    def __leaf_position(self, hashed_value):
+        """
+        Devuelve la posición de la hoja con el digest indicado, o None si no existe.
+
+        El índice digest -> posición se construye una sola vez, en la primera consulta.
+        Si un elemento aparece varias veces se conserva su primera posición.
+        """
+        if self.__index is None:
+            index = {}
+            for position in range(len(self.__levels[0])):
+                digest = self.__value(0, position)
+                if digest in index:
+                    self.__duplicates.add(digest)
+                else:
+                    index[digest] = position
+            self.__index = index
+        return self.__index.get(hashed_value)
 
     def contains(self, value):
         """
@@ -133,28 +710,15 @@ class MerkleTree:
             return False
 
         hashed_value = self.digest(value)
-        return self.__find(self.root, hashed_value) is not None
-
-    def __find(self, node, value):
-        """
-        Búsqueda interna en el árbol.
-
-        Args:
-            node (__Node): Nodo actual.
-            value: Valor (hash) a buscar.
-        Returns:
-            __Node o None: El nodo si se encuentra; None en otro caso.
-        """
-        if node is None:
-            return None
-        if node.value == value:
-            return node
-        return self.__find(node.left, value) or self.__find(node.right, value)
+        return self.__leaf_position(hashed_value) is not None
 
     def request_proof(self, value):
         """
         Proporciona la prueba (Merkle branch) para demostrar la integridad de un elemento.
 
+        La rama se obtiene recorriendo los índices hermanos desde la hoja hasta la raíz,
+        por lo que su costo es O(log n).
+
         Args:
             value: El elemento para el cual se solicita la prueba.
         Returns:
@@ -163,31 +727,71 @@ class MerkleTree:
             Exception: Si el valor no se encuentra en el árbol.
         """
         hashed_value = self.digest(value)
-        if self.__find(self.root, hashed_value) is None:
+        position = self.__leaf_position(hashed_value)
+        if position is None:
             raise Exception('Este elemento no se encuentra en el árbol.')
 
         proof = []
-        self.__build_valid_proof(self.root, hashed_value, proof)
-        if len(proof) != 0:
-            # Se inserta la rama final (la raíz) en la prueba
-            proof.insert(0, (0 if proof[1][0] else 1, hashed_value))
+        for level in range(len(self.__levels) - 1):
+            # Si el nodo es hijo izquierdo, se añade el hash del hijo derecho y viceversa
+            if position % 2 == 0:
+                sibling = position + 1
+                if sibling >= len(self.__levels[level]):
+                    # En un nivel impar el último nodo es su propio hermano
+                    sibling = position
+                proof.append((0, self.__value(level, sibling)))
+            else:
+                proof.append((1, self.__value(level, position - 1)))
+            position //= 2
+
+        # Se inserta la hoja al inicio de la prueba
+        reference = proof[1] if len(proof) > 1 else proof[0]
+        proof.insert(0, (0 if reference[0] else 1, hashed_value))
         return proof
 
-    def __build_valid_proof(self, node, value, proof_list):
-        if node is None:
-            return False
-        if node.value == value:
-            return True
+    def request_multiproof(self, values):
+        """
+        Proporciona una prueba conjunta para varios elementos.
 
-        found_left = self.__build_valid_proof(node.left, value, proof_list)
-        found_right = self.__build_valid_proof(node.right, value, proof_list)
-        if not found_left and not found_right:
-            return False
+        Cada nodo interno compartido por las ramas se envía una sola vez, y los nodos
+        que el verificador puede calcular a partir de las hojas probadas no se envían.
 
-        # Si se encuentra en el subárbol izquierdo, se añade el hash del hijo derecho y viceversa
-        n = (0, node.right.value) if found_left else (1, node.left.value)
-        proof_list.append(n)
-        return True
+        Args:
+            values (iterable): Elementos para los cuales se solicita la prueba.
+        Returns:
+            MultiProof: Prueba conjunta, verificable con `verify_multiproof`.
+        Throws:
+            Exception: Si algún valor no se encuentra en el árbol.
+        """
+        leaves = {}
+        for value in values:
+            hashed_value = self.digest(value)
+            position = self.__leaf_position(hashed_value)
+            if position is None:
+                raise Exception('Este elemento no se encuentra en el árbol.')
+            leaves[position] = hashed_value
+
+        positions = sorted(leaves)
+        hashes = []
+        known = positions
+        for level in range(len(self.__levels) - 1):
+            size = len(self.__levels[level])
+            known_set = set(known)
+            parents = []
+            for position in known:
+                if position % 2 == 0:
+                    sibling = position + 1
+                    if sibling < size and sibling not in known_set:
+                        hashes.append(self.__value(level, sibling))
+                elif position - 1 in known_set:
+                    # El par ya se procesó desde el hijo izquierdo
+                    continue
+                else:
+                    hashes.append(self.__value(level, position - 1))
+                parents.append(position // 2)
+            known = parents
+
+        return MultiProof(len(self.__levels[0]), positions, [leaves[p] for p in positions], hashes)
 
     def dump(self, indent=0):
         if self.root is None:
@@ -202,5 +806,575 @@ class MerkleTree:
         self.__print(node.right, indent + 2)
 
     def __contains__(self, value):
-        hashed_value = self.digest(value)
-        return self.__find(self.root, hashed_value)
+        return self.contains(value)
+
+    def __len__(self):
+        """Número de hojas del árbol."""
+        return len(self.__levels[0])
+
+    @property
+    def height(self):
+        """Número de niveles, contando las hojas y la raíz."""
+        return len(self.__levels)
+
+    def digest_at(self, level, position):
+        """
+        Digest del nodo en la posición `position` del nivel `level` (0 son las hojas).
+
+        Throws:
+            IndexError: Si el nivel o la posición no existen.
+        """
+        if not 0 <= level < len(self.__levels) or not 0 <= position < len(self.__levels[level]):
+            raise IndexError('El nodo ({0}, {1}) no existe en el árbol.'.format(level, position))
+        return self.__value(level, position)
+
+    def diff(self, other):
+        """
+        Devuelve las posiciones de las hojas que difieren respecto de otro árbol.
+
+        Solo se desciende por los subárboles cuyo hash es distinto, con un costo de
+        O(k log n) para k hojas distintas. Si los árboles tienen distinto tamaño, las
+        hojas sobrantes del mayor también se reportan.
+
+        Args:
+            other (MerkleTree): Árbol con el que se compara.
+        Returns:
+            list: Posiciones distintas, en orden ascendente.
+        """
+        sizes = [len(level) for level in self.__levels]
+        other_sizes = _level_sizes(len(other))
+        return _diff_levels(sizes, self.__value, other_sizes,
+                            lambda level, positions: [other.digest_at(level, p) for p in positions])
+
+
+class _SortedLeafIndex:
+    """
+    Índice digest -> posición leído desde el archivo de un árbol guardado.
+
+    Los registros están ordenados por (digest, posición), de modo que la búsqueda
+    binaria encuentra la primera aparición de un digest sin cargar nada en memoria.
+    """
+
+    def __init__(self, buffer, width):
+        self.buffer = buffer
+        self.width = width
+        self.record = width + 8
+
+    def __len__(self):
+        return len(self.buffer) // self.record
+
+    def __getitem__(self, index):
+        start = index * self.record
+        return bytes(self.buffer[start:start + self.width])
+
+    def get(self, digest, default=None):
+        index = bisect.bisect_left(self, digest)
+        if index < len(self) and self[index] == digest:
+            start = index * self.record + self.width
+            return int.from_bytes(self.buffer[start:start + 8], byteorder='little')
+        return default
+
+
+class MerkleStream:
+    """
+    Constructor incremental de la raíz de Merkle.
+
+    Funciona como un contador binario: guarda a lo sumo un subárbol pendiente por
+    nivel, por lo que la memoria usada es O(log n) sin importar cuántos elementos
+    se añadan. La raíz coincide con la de `MerkleTree` para la misma secuencia,
+    incluida la regla que duplica el último nodo de un nivel impar. No guarda los
+    niveles, así que no puede emitir pruebas.
+    """
+
+    def __init__(self, digest_delegate=None):
+        """
+        Args:
+            digest_delegate (function): Función digest; por defecto SHA-1.
+        """
+        self.digest = _resolve_digest(digest_delegate)
+        self.__pair = _pair_hasher(self.digest)
+        self.count = 0
+        self.__pending = []
+
+    def append(self, item):
+        """Añade un elemento combinando los subárboles completos que se formen."""
+        digest = self.digest(item)
+        level = 0
+        while level < len(self.__pending) and self.__pending[level] is not None:
+            digest = self.__pair(self.__pending[level], digest)
+            self.__pending[level] = None
+            level += 1
+        if level == len(self.__pending):
+            self.__pending.append(digest)
+        else:
+            self.__pending[level] = digest
+        self.count += 1
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    @property
+    def root(self):
+        """
+        Raíz de los elementos añadidos hasta ahora (bytes).
+
+        Los subárboles pendientes se cierran de abajo hacia arriba: un nodo sin
+        hermano se empareja consigo mismo, salvo el más alto, que es la raíz.
+        """
+        if self.count == 0:
+            raise Exception("La colección no puede estar vacía.")
+
+        top = max(level for level, node in enumerate(self.__pending) if node is not None)
+        carry = None
+        for level, node in enumerate(self.__pending):
+            if carry is None:
+                if node is None:
+                    continue
+                if level == top and level > 0:
+                    return node
+                carry = self.__pair(node, node)
+            elif node is not None:
+                carry = self.__pair(node, carry)
+            elif level < top:
+                carry = self.__pair(carry, carry)
+            else:
+                break
+        return carry
+
+
+def _root_digest(root):
+    """Permite pasar la raíz como bytes o como el nodo devuelto por `MerkleTree.root`."""
+    return getattr(root, 'value', root)
+
+
+def verify_proof(root, proof, digest_delegate=None):
+    """
+    Verifica una prueba devuelta por `MerkleTree.request_proof`.
+
+    Args:
+        root: Raíz esperada (bytes o nodo raíz).
+        proof (list): Rama de Merkle; la primera tupla contiene el digest de la hoja.
+        digest_delegate (function): Función digest (o nombre de backend) usada por el árbol;
+                                      por defecto SHA-1.
+    Returns:
+        bool: True si la rama reconstruye la raíz.
+    """
+    pair = _pair_hasher(_resolve_digest(digest_delegate))
+    if not proof:
+        return False
+
+    current = proof[0][1]
+    for side, sibling in proof[1:]:
+        # 0: el nodo actual es hijo izquierdo; 1: es hijo derecho
+        current = pair(current, sibling) if side == 0 else pair(sibling, current)
+    return current == _root_digest(root)
+
+
+def verify_many(root, proofs, digest_delegate=None):
+    """
+    Verifica un lote de pruebas contra la misma raíz.
+
+    Los nodos obtenidos al verificar una prueba válida quedan registrados; cuando una
+    rama posterior alcanza uno de ellos, el resto del camino ya está comprobado y no
+    se vuelve a calcular.
+
+    Args:
+        root: Raíz esperada (bytes o nodo raíz).
+        proofs (iterable): Pruebas devueltas por `MerkleTree.request_proof`.
+        digest_delegate (function): Función digest (o nombre de backend) usada por el árbol;
+                                      por defecto SHA-1.
+    Returns:
+        list: Un bool por prueba, en el mismo orden.
+    """
+    pair = _pair_hasher(_resolve_digest(digest_delegate))
+    root = _root_digest(root)
+    verified = set()
+    results = []
+    for proof in proofs:
+        if not proof:
+            results.append(False)
+            continue
+
+        current = proof[0][1]
+        path = [current]
+        for side, sibling in proof[1:]:
+            if current in verified:
+                break
+            current = pair(current, sibling) if side == 0 else pair(sibling, current)
+            path.append(current)
+
+        valid = current in verified or current == root
+        if valid:
+            verified.update(path)
+        results.append(valid)
+    return results
+
+
+def verify_multiproof(root, multiproof, digest_delegate=None):
+    """
+    Verifica una prueba conjunta devuelta por `MerkleTree.request_multiproof`.
+
+    Cada nodo interno se calcula una sola vez, aunque lo compartan varias hojas.
+
+    Args:
+        root: Raíz esperada (bytes o nodo raíz).
+        multiproof (MultiProof): Prueba conjunta.
+        digest_delegate (function): Función digest (o nombre de backend) usada por el árbol;
+                                      por defecto SHA-1.
+    Returns:
+        bool: True si todas las hojas reconstruyen la raíz.
+    """
+    pair = _pair_hasher(_resolve_digest(digest_delegate))
+    size = multiproof.leaf_count
+    positions = list(multiproof.positions)
+    if not positions or len(positions) != len(multiproof.leaves) or \
+            positions != sorted(set(positions)) or positions[0] < 0 or positions[-1] >= size:
+        return False
+
+    nodes = dict(zip(positions, multiproof.leaves))
+    hashes = iter(multiproof.hashes)
+    first_level = True
+    # Se sube nivel por nivel, igual que al construir el árbol
+    while first_level or size > 1:
+        parents = {}
+        for position in sorted(nodes):
+            current = nodes[position]
+            if position % 2 == 0:
+                if position + 1 >= size:
+                    # En un nivel impar el último nodo se empareja consigo mismo
+                    sibling = current
+                elif position + 1 in nodes:
+                    sibling = nodes[position + 1]
+                else:
+                    sibling = next(hashes, None)
+                parent = None if sibling is None else pair(current, sibling)
+            elif position - 1 in nodes:
+                continue
+            else:
+                sibling = next(hashes, None)
+                parent = None if sibling is None else pair(sibling, current)
+            if parent is None:
+                return False
+            parents[position // 2] = parent
+        nodes = parents
+        size = (size + 1) // 2
+        first_level = False
+
+    return next(hashes, None) is None and nodes.get(0) == _root_digest(root)
+
+
+# Protocolo de sincronización: cada mensaje es un entero big-endian de 4 bytes con la
+# longitud, seguido del contenido. El primer byte del contenido es la operación.
+_SYNC_HELLO = b'H'
+_SYNC_QUERY = b'Q'
+_SYNC_BYE = b'B'
+_SYNC_HEADER = struct.Struct('>QH')
+_SYNC_QUERY_HEADER = struct.Struct('>HI')
+
+
+def _send_frame(sock, payload):
+    sock.sendall(len(payload).to_bytes(4, byteorder='big') + payload)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError('La conexión se cerró durante la sincronización.')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_frame(sock):
+    return _recv_exact(sock, int.from_bytes(_recv_exact(sock, 4), byteorder='big'))
+
+
+def serve_sync(tree, sock):
+    """
+    Atiende una sincronización iniciada con `sync_diff` desde el otro extremo del socket.
+
+    Responde al saludo con el número de hojas y el tamaño del digest, y a cada consulta
+    con los digests de las posiciones pedidas de un nivel. Termina cuando recibe el
+    mensaje de cierre.
+
+    Args:
+        tree (MerkleTree): Árbol local.
+        sock (socket.socket): Socket conectado.
+    Returns:
+        int: Cantidad de digests enviados.
+    """
+    sent = 0
+    while True:
+        message = _recv_frame(sock)
+        operation, body = message[:1], message[1:]
+        if operation == _SYNC_HELLO:
+            _send_frame(sock, _SYNC_HEADER.pack(len(tree), len(tree.digest_at(0, 0))))
+        elif operation == _SYNC_QUERY:
+            level, count = _SYNC_QUERY_HEADER.unpack_from(body)
+            positions = struct.unpack_from('>{0}Q'.format(count), body, _SYNC_QUERY_HEADER.size)
+            _send_frame(sock, b''.join(tree.digest_at(level, p) for p in positions))
+            sent += count
+        elif operation == _SYNC_BYE:
+            return sent
+        else:
+            raise Exception('Operación de sincronización desconocida: {0!r}'.format(operation))
+
+
+def sync_diff(tree, sock):
+    """
+    Compara el árbol local con el que atiende `serve_sync` al otro lado del socket.
+
+    La comparación se hace nivel por nivel: en cada ronda se piden solo los hashes de
+    los hijos de los nodos que difirieron en la ronda anterior, así que se transfieren
+    O(k log n) hashes para k hojas distintas.
+
+    Args:
+        tree (MerkleTree): Árbol local.
+        sock (socket.socket): Socket conectado.
+    Returns:
+        list: Posiciones de las hojas distintas, en orden ascendente.
+    """
+    _send_frame(sock, _SYNC_HELLO)
+    leaf_count, width = _SYNC_HEADER.unpack(_recv_frame(sock))
+    if width != len(tree.digest_at(0, 0)):
+        _send_frame(sock, _SYNC_BYE)
+        raise Exception('Los árboles usan digests de distinto tamaño.')
+
+    def fetch_remote(level, positions):
+        query = _SYNC_QUERY_HEADER.pack(level, len(positions))
+        _send_frame(sock, _SYNC_QUERY + query + struct.pack('>{0}Q'.format(len(positions)), *positions))
+        packed = _recv_frame(sock)
+        return [packed[i:i + width] for i in range(0, len(packed), width)]
+
+    try:
+        local_sizes = _level_sizes(len(tree))
+        return _diff_levels(local_sizes, tree.digest_at, _level_sizes(leaf_count), fetch_remote)
+    finally:
+        _send_frame(sock, _SYNC_BYE)
+
+
+# Prueba de un árbol de Merkle disperso: el bit h de `bitmap` indica que el hermano en
+# la altura h no es un subárbol vacío; `siblings` contiene solo esos hermanos, de la
+# hoja hacia la raíz.
+SparseMerkleProof = namedtuple('SparseMerkleProof', ['bitmap', 'siblings'])
+
+
+def _empty_hashes(digest):
+    """Hashes de los subárboles vacíos de cada altura: 0 es la hoja vacía."""
+    pair = _pair_hasher(digest)
+    empty = [bytes(len(digest(b'')))]
+    for _ in range(len(empty[0]) * 8):
+        empty.append(pair(empty[-1], empty[-1]))
+    return empty
+
+
+class SparseMerkleTree:
+    """
+    Árbol de Merkle disperso para un almacén clave-valor.
+
+    Cada clave ocupa la hoja indicada por los bits de su hash, así que la profundidad
+    es el tamaño del digest en bits. Los subárboles vacíos no se guardan: sus hashes
+    se precalculan una vez por altura. Solo se almacenan los nodos con dos o más
+    claves y, para cada clave, la cima de su subárbol de una sola clave; la memoria
+    es proporcional al número de claves. Insertar, borrar y generar pruebas cuesta
+    O(profundidad), y las pruebas pueden demostrar pertenencia o no pertenencia.
+    """
+
+    def __init__(self, digest_delegate=None):
+        """
+        Args:
+            digest_delegate (function): Función digest (o nombre de backend); por defecto SHA-1.
+        """
+        self.digest = _resolve_digest(digest_delegate)
+        self.__pair = _pair_hasher(self.digest)
+        self.__empty = _empty_hashes(self.digest)
+        self.depth = len(self.__empty) - 1
+        # (altura, prefijo) -> digest de nodos con varias claves y de cimas de una sola clave
+        self.__nodes = {}
+        # (altura, prefijo) -> hash de la clave, solo para las cimas de una sola clave
+        self.__single = {}
+        # hash de la clave -> (valor, digest de la hoja)
+        self.__values = {}
+
+    @property
+    def root(self):
+        """Raíz del árbol (bytes); la de un árbol vacío es el subárbol vacío de máxima altura."""
+        return self.__nodes.get((self.depth, 0), self.__empty[self.depth])
+
+    def __len__(self):
+        return len(self.__values)
+
+    def __contains__(self, key):
+        return self.digest(key) in self.__values
+
+    def get(self, key, default=None):
+        """Valor asociado a `key`, o `default` si la clave no existe."""
+        entry = self.__values.get(self.digest(key))
+        return default if entry is None else entry[0]
+
+    def __path(self, key_hash):
+        return int.from_bytes(key_hash, byteorder='big')
+
+    def __descend(self, path):
+        """Primer nodo del camino, desde la raíz, que no tiene varias claves."""
+        height = self.depth
+        while (height, path >> height) in self.__nodes and (height, path >> height) not in self.__single:
+            height -= 1
+        return height, path >> height
+
+    def __single_hash(self, height, key_hash, leaf):
+        """Hash de un subárbol de altura `height` que solo contiene la hoja `leaf`."""
+        path = self.__path(key_hash)
+        current = leaf
+        for level in range(height):
+            if (path >> level) & 1:
+                current = self.__pair(self.__empty[level], current)
+            else:
+                current = self.__pair(current, self.__empty[level])
+        return current
+
+    def __set_single(self, height, prefix, key_hash, leaf):
+        self.__nodes[(height, prefix)] = self.__single_hash(height, key_hash, leaf)
+        self.__single[(height, prefix)] = key_hash
+
+    def __rehash_path(self, path, start):
+        """Recalcula los nodos con varias claves del camino, desde la altura `start` hasta la raíz."""
+        for height in range(start, self.depth + 1):
+            prefix = path >> height
+            left = self.__nodes.get((height - 1, 2 * prefix), self.__empty[height - 1])
+            right = self.__nodes.get((height - 1, 2 * prefix + 1), self.__empty[height - 1])
+            self.__nodes[(height, prefix)] = self.__pair(left, right)
+
+    def insert(self, key, value):
+        """
+        Inserta o reemplaza el valor de `key`.
+
+        Args:
+            key: Clave (entero, cadena o bytes).
+            value: Valor asociado; se guarda tal cual y en la hoja se usa su digest.
+        """
+        key_hash = self.digest(key)
+        path = self.__path(key_hash)
+        leaf = self.__pair(key_hash, self.digest(value))
+        height, prefix = self.__descend(path)
+        other = self.__single.get((height, prefix))
+
+        if other is None or other == key_hash:
+            # Subárbol vacío, o la misma clave: la cima de una sola clave queda en este nodo
+            self.__set_single(height, prefix, key_hash, leaf)
+            start = height + 1
+        else:
+            # Otra clave comparte el subárbol: ambas bajan hasta el nivel donde sus caminos se separan
+            other_path = self.__path(other)
+            split = (path ^ other_path).bit_length()
+            del self.__single[(height, prefix)]
+            self.__set_single(split - 1, path >> (split - 1), key_hash, leaf)
+            self.__set_single(split - 1, other_path >> (split - 1), other, self.__values[other][1])
+            start = split
+
+        self.__values[key_hash] = (value, leaf)
+        self.__rehash_path(path, start)
+
+    def delete(self, key):
+        """
+        Elimina `key` del árbol.
+
+        Throws:
+            KeyError: Si la clave no existe.
+        """
+        key_hash = self.digest(key)
+        if key_hash not in self.__values:
+            raise KeyError(key)
+        path = self.__path(key_hash)
+        height, prefix = self.__descend(path)
+        del self.__nodes[(height, prefix)]
+        del self.__single[(height, prefix)]
+        del self.__values[key_hash]
+
+        # Si el padre queda con una sola clave, esa cima sube un nivel, y así sucesivamente
+        while height < self.depth:
+            current, sibling = (height, prefix), (height, prefix ^ 1)
+            if current in self.__single and sibling not in self.__nodes:
+                moving = current
+            elif current not in self.__nodes and sibling in self.__single:
+                moving = sibling
+            else:
+                break
+            moved_key = self.__single.pop(moving)
+            digest = self.__nodes.pop(moving)
+            if moving[1] & 1:
+                parent_digest = self.__pair(self.__empty[height], digest)
+            else:
+                parent_digest = self.__pair(digest, self.__empty[height])
+            height, prefix = height + 1, prefix >> 1
+            self.__nodes[(height, prefix)] = parent_digest
+            self.__single[(height, prefix)] = moved_key
+
+        self.__rehash_path(path, height + 1)
+
+    def prove(self, key):
+        """
+        Genera una prueba de pertenencia (si la clave existe) o de no pertenencia.
+
+        Args:
+            key: Clave a probar.
+        Returns:
+            SparseMerkleProof: Prueba verificable con `verify_sparse_proof`.
+        """
+        key_hash = self.digest(key)
+        path = self.__path(key_hash)
+        height, prefix = self.__descend(path)
+        bitmap = 0
+        siblings = []
+
+        other = self.__single.get((height, prefix))
+        if other is not None and other != key_hash:
+            # La hoja está vacía, pero el subárbol contiene otra clave: su rama es el único
+            # hermano no vacío por debajo de `height`
+            other_path = self.__path(other)
+            split = (path ^ other_path).bit_length()
+            bitmap |= 1 << (split - 1)
+            siblings.append(self.__single_hash(split - 1, other, self.__values[other][1]))
+
+        for level in range(height, self.depth):
+            sibling = self.__nodes.get((level, (path >> level) ^ 1))
+            if sibling is not None:
+                bitmap |= 1 << level
+                siblings.append(sibling)
+        return SparseMerkleProof(bitmap, siblings)
+
+
+def verify_sparse_proof(root, key, value, proof, digest_delegate=None):
+    """
+    Verifica una prueba de `SparseMerkleTree.prove`.
+
+    Args:
+        root (bytes): Raíz esperada.
+        key: Clave probada.
+        value: Valor esperado, o None para verificar que la clave no existe.
+        proof (SparseMerkleProof): Prueba a verificar.
+        digest_delegate (function): Función digest (o nombre de backend) del árbol;
+                                      por defecto SHA-1.
+    Returns:
+        bool: True si la prueba reconstruye la raíz.
+    """
+    digest = _resolve_digest(digest_delegate)
+    pair = _pair_hasher(digest)
+    empty = _empty_hashes(digest)
+    key_hash = digest(key)
+    path = int.from_bytes(key_hash, byteorder='big')
+
+    current = empty[0] if value is None else pair(key_hash, digest(value))
+    siblings = iter(proof.siblings)
+    for level in range(len(empty) - 1):
+        if (proof.bitmap >> level) & 1:
+            sibling = next(siblings, None)
+            if sibling is None:
+                return False
+        else:
+            sibling = empty[level]
+        current = pair(sibling, current) if (path >> level) & 1 else pair(current, sibling)
+    return next(siblings, None) is None and current == root
@@ -1,5 +1,10 @@
 import hashlib
+import os
+import socket
+import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 # Se asume que la clase MerkleTree se encuentra en un módulo llamado merkletree.
 import merkletree
 
@@ -87,5 +92,235 @@ class MerkleTest(unittest.TestCase):
         self.assertEqual(tree_even.root.value, root_even, even_error_feedback)
         self.assertEqual(tree_odd.root.value, root_odd, odd_error_feedback)
 
+    def test_compact_mode_matches_node_tree(self):
+        # El modo compacto debe producir la misma raíz, pertenencia y pruebas que el basado en nodos.
+        for size in [3, 4, 5, 6, 11, 16]:
+            sequence = list(range(size))
+            tree = merkletree.MerkleTree(sequence)
+            compact = merkletree.MerkleTree(sequence, compact=True)
+
+            self.assertEqual(compact.root.value, tree.root.value)
+            self.assertTrue(compact.contains(sequence[-1]))
+            self.assertFalse(compact.contains(size + 100))
+            for value in sequence:
+                self.assertEqual(compact.request_proof(value), tree.request_proof(value))
+
+    def test_request_proof_walks_sibling_indices(self):
+        # Para una hoja del árbol de 4 elementos la rama coincide con la construida a mano.
+        tree = merkletree.MerkleTree(['tx1', 'tx2', 'tx3', 'tx4'], digest_delegate=H)
+        digests = [H(x) for x in ['tx1', 'tx2', 'tx3', 'tx4']]
+        d12 = H(digests[0] + digests[1])
+        d34 = H(digests[2] + digests[3])
+
+        self.assertEqual(tree.request_proof('tx1'), [(1, digests[0]), (0, digests[1]), (0, d34)])
+        self.assertEqual(tree.request_proof('tx4'), [(0, digests[3]), (1, digests[2]), (1, d12)])
+        with self.assertRaises(Exception):
+            tree.request_proof('tx5')
+
+    def test_request_proof_on_odd_levels(self):
+        # En un nivel impar el último nodo aparece una sola vez como su propio hermano.
+        tree = merkletree.MerkleTree([1, 2, 3, 4, 5])
+        digests = [H(x) for x in [1, 2, 3, 4, 5]]
+        d55 = H(digests[4] + digests[4])
+        d1234 = H(H(digests[0] + digests[1]) + H(digests[2] + digests[3]))
+        self.assertEqual(tree.request_proof(5), [(1, digests[4]), (0, digests[4]), (0, d55), (1, d1234)])
+
+        single = merkletree.MerkleTree(['solo'])
+        self.assertEqual(single.request_proof('solo'), [(1, H('solo')), (0, H('solo'))])
+        self.assertIn('solo', single)
+        self.assertNotIn('otro', single)
+
+    def test_incremental_changes_match_full_rebuild(self):
+        # append, extend y update deben dejar la misma raíz que reconstruir el árbol completo.
+        for compact in (False, True):
+            sequence = ['tx1']
+            tree = merkletree.MerkleTree(sequence, compact=compact)
+            for item in ['tx2', 'tx3']:
+                tree.append(item)
+                sequence.append(item)
+                self.assertEqual(tree.root.value, merkletree.MerkleTree(sequence).root.value)
+
+            tree.extend(['tx4', 'tx5', 'tx6'])
+            sequence.extend(['tx4', 'tx5', 'tx6'])
+            self.assertEqual(tree.root.value, merkletree.MerkleTree(sequence).root.value)
+
+            tree.update(4, 'tx1')
+            sequence[4] = 'tx1'
+            self.assertEqual(tree.root.value, merkletree.MerkleTree(sequence).root.value)
+            self.assertFalse(tree.contains('tx5'))
+            self.assertEqual(tree.request_proof('tx1'), merkletree.MerkleTree(sequence).request_proof('tx1'))
+
+            tree.update(0, 'tx0')
+            self.assertTrue(tree.contains('tx1'))
+            with self.assertRaises(IndexError):
+                tree.update(6, 'tx7')
+
+    def test_parallel_build_matches_serial_build(self):
+        # El hashing en bloques sobre un pool debe dar exactamente el mismo árbol.
+        sequence = ['tx{0}'.format(i) for i in range(37)]
+        serial = merkletree.MerkleTree(sequence)
+        for compact in (False, True):
+            parallel = merkletree.MerkleTree(sequence, compact=compact, workers=3)
+            self.assertEqual(parallel.root.value, serial.root.value)
+            self.assertEqual(parallel.request_proof('tx36'), serial.request_proof('tx36'))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            tree = merkletree.MerkleTree(sequence, digest_delegate=H, executor=executor)
+        self.assertEqual(tree.root.value, serial.root.value)
+
+    def test_streaming_root_matches_tree(self):
+        # La raíz calculada en streaming debe coincidir con la del árbol en memoria.
+        for size in range(1, 34):
+            sequence = ['tx{0}'.format(i) for i in range(size)]
+            stream = merkletree.MerkleTree.from_stream(iter(sequence))
+            self.assertEqual(stream.root, merkletree.MerkleTree(sequence).root.value)
+            self.assertEqual(stream.count, size)
+
+        with self.assertRaises(Exception):
+            merkletree.MerkleTree.from_stream([]).root
+
+    def test_streaming_root_from_file(self):
+        data = bytes(range(256)) * 40
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'datos.log')
+            with open(path, 'wb') as fp:
+                fp.write(data)
+            stream = merkletree.MerkleTree.from_file(path, chunk_size=1000)
+
+        chunks = [data[i:i + 1000] for i in range(0, len(data), 1000)]
+        self.assertEqual(stream.count, len(chunks))
+        self.assertEqual(stream.root, merkletree.MerkleTree(chunks).root.value)
+
+    def test_verify_proof_and_batch(self):
+        sequence = ['tx{0}'.format(i) for i in range(11)]
+        tree = merkletree.MerkleTree(sequence, digest_delegate=H)
+        proofs = [tree.request_proof(item) for item in sequence]
+
+        self.assertTrue(merkletree.verify_proof(tree.root.value, proofs[3], digest_delegate=H))
+        self.assertEqual(merkletree.verify_many(tree.root, proofs, digest_delegate=H), [True] * len(sequence))
+
+        tampered = list(proofs[3])
+        tampered[-1] = (tampered[-1][0], H('otro'))
+        self.assertFalse(merkletree.verify_proof(tree.root, tampered, digest_delegate=H))
+        self.assertEqual(merkletree.verify_many(tree.root, [tampered, proofs[4]], digest_delegate=H), [False, True])
+
+    def test_multiproof_sends_shared_nodes_once(self):
+        sequence = ['tx{0}'.format(i) for i in range(11)]
+        tree = merkletree.MerkleTree(sequence)
+        multiproof = tree.request_multiproof(['tx0', 'tx1', 'tx2', 'tx10'])
+
+        self.assertEqual(multiproof.positions, [0, 1, 2, 10])
+        self.assertTrue(merkletree.verify_multiproof(tree.root, multiproof))
+        single_hashes = sum(len(tree.request_proof(x)) - 1 for x in ['tx0', 'tx1', 'tx2', 'tx10'])
+        self.assertLess(len(multiproof.hashes), single_hashes)
+
+        forged = multiproof._replace(leaves=[H('tx9')] + multiproof.leaves[1:])
+        self.assertFalse(merkletree.verify_multiproof(tree.root, forged))
+        self.assertFalse(merkletree.verify_multiproof(tree.root, multiproof._replace(hashes=multiproof.hashes[1:])))
+        with self.assertRaises(Exception):
+            tree.request_multiproof(['tx0', 'tx99'])
+
+    def test_save_and_load_memory_mapped_tree(self):
+        sequence = ['tx{0}'.format(i % 7) for i in range(23)]
+        for compact in (False, True):
+            tree = merkletree.MerkleTree(sequence, compact=compact)
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'arbol.mrkl')
+                tree.save(path)
+                loaded = merkletree.MerkleTree.load(path)
+
+                self.assertEqual(loaded.root.value, tree.root.value)
+                for item in set(sequence):
+                    self.assertEqual(loaded.request_proof(item), tree.request_proof(item))
+                self.assertFalse(loaded.contains('tx7'))
+                with self.assertRaises(Exception):
+                    loaded.append('tx7')
+                with self.assertRaises(Exception):
+                    merkletree.MerkleTree.load(path, digest_delegate=lambda x: hashlib.sha256(x).digest())
+                del loaded
+
+    def test_named_digest_backends(self):
+        sequence = [1, 'tx', b'raw', True, 2.5]
+        default = merkletree.MerkleTree(sequence)
+        self.assertEqual(merkletree.MerkleTree(sequence, digest_delegate='sha1-copy').root.value, default.root.value)
+
+        for name in ['sha256', 'sha256-copy', 'blake2b', 'blake2b-copy']:
+            backend = merkletree.get_digest_backend(name)
+            tree = merkletree.MerkleTree(sequence, digest_delegate=name, compact=True)
+            nodes = merkletree.MerkleTree(sequence, digest_delegate=backend)
+            self.assertEqual(tree.root.value, nodes.root.value)
+            self.assertEqual(len(tree.root.value), backend.digest_size)
+            self.assertEqual(backend.pair(memoryview(b'ab'), b'cd'), backend(b'abcd'))
+            self.assertTrue(merkletree.verify_proof(tree.root, tree.request_proof('tx'), digest_delegate=name))
+
+        self.assertEqual(merkletree.get_digest_backend('sha256')('tx'), hashlib.sha256(b'tx').digest())
+        with self.assertRaises(ValueError):
+            merkletree.get_digest_backend('md0')
+
+    def test_diff_returns_changed_leaves(self):
+        sequence = ['tx{0}'.format(i) for i in range(21)]
+        changed = list(sequence)
+        changed[3] = 'otro'
+        changed[20] = 'otro'
+        tree = merkletree.MerkleTree(sequence)
+        replica = merkletree.MerkleTree(changed, compact=True)
+
+        self.assertEqual(tree.diff(replica), [3, 20])
+        self.assertEqual(tree.diff(merkletree.MerkleTree(sequence)), [])
+        self.assertEqual(tree.diff(merkletree.MerkleTree(sequence[:18])), [18, 19, 20])
+
+    def test_sync_over_socket_pair(self):
+        sequence = ['tx{0}'.format(i) for i in range(50)]
+        changed = list(sequence) + ['tx50']
+        changed[7] = 'otro'
+        local = merkletree.MerkleTree(sequence)
+        remote = merkletree.MerkleTree(changed, compact=True)
+
+        client, server = socket.socketpair()
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(sent=merkletree.serve_sync(remote, server)))
+        worker.start()
+        try:
+            self.assertEqual(merkletree.sync_diff(local, client), [7, 50])
+        finally:
+            worker.join()
+            client.close()
+            server.close()
+        # Solo se piden los hijos de los nodos distintos, no todo el árbol
+        self.assertLess(result['sent'], 2 * len(changed))
+
+    def test_sparse_tree_inclusion_and_non_inclusion(self):
+        tree = merkletree.SparseMerkleTree()
+        empty_root = tree.root
+        for i in range(20):
+            tree.insert('k{0}'.format(i), i)
+        tree.insert('k3', 'nuevo')
+
+        self.assertEqual(len(tree), 20)
+        self.assertEqual(tree.get('k3'), 'nuevo')
+        self.assertIsNone(tree.get('falta'))
+        self.assertIn('k5', tree)
+
+        proof = tree.prove('k5')
+        self.assertTrue(merkletree.verify_sparse_proof(tree.root, 'k5', 5, proof))
+        self.assertFalse(merkletree.verify_sparse_proof(tree.root, 'k5', 6, proof))
+        self.assertFalse(merkletree.verify_sparse_proof(tree.root, 'k5', None, proof))
+
+        absent = tree.prove('falta')
+        self.assertTrue(merkletree.verify_sparse_proof(tree.root, 'falta', None, absent))
+        self.assertFalse(merkletree.verify_sparse_proof(tree.root, 'falta', 1, absent))
+
+        # La raíz solo depende del contenido, no del orden de las operaciones
+        other = merkletree.SparseMerkleTree()
+        for i in reversed(range(20)):
+            other.insert('k{0}'.format(i), 'nuevo' if i == 3 else i)
+        self.assertEqual(tree.root, other.root)
+
+        for i in range(20):
+            tree.delete('k{0}'.format(i))
+        self.assertEqual(tree.root, empty_root)
+        with self.assertRaises(KeyError):
+            tree.delete('k0')
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
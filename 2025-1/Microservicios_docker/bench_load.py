@@ -0,0 +1,126 @@
+"""
+Prueba de carga con tráfico mixto POST/GET sobre /api/items/.
+
+Uso:
+    python bench_load.py [--requests 4000] [--concurrency 16] [--write-ratio 0.2] [--seed-items 200]
+    python bench_load.py --url http://localhost:8000   # contra un servidor ya levantado
+
+Sin `--url` levanta dos servidores uvicorn, cada uno con una base vacía en un directorio
+temporal: uno con `DB_POOL=0` (una conexión por llamada, journal por defecto: el
+comportamiento anterior) y otro con el pool por hilo en modo WAL. Imprime requests/s y
+latencias de ambos.
+"""
+import argparse
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(db_pool: bool, workdir: str) -> Tuple[subprocess.Popen, str]:
+    """
+    Arranca uvicorn en un subproceso; la base `app.db` se crea en `workdir`.
+    """
+    port = _free_port()
+    env = dict(os.environ, DB_POOL="1" if db_pool else "0", PYTHONPATH=str(ROOT))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "microservice.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/api/items/", timeout=1)
+            return process, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def run_load(url: str, requests: int, concurrency: int, write_ratio: float, seed_items: int) -> Dict[str, float]:
+    """
+    Envía `requests` peticiones (una fracción `write_ratio` son POST) desde `concurrency` hilos.
+    """
+    prefix = uuid.uuid4().hex[:8]
+    counter = itertools.count()
+    with httpx.Client(base_url=url, timeout=30, limits=httpx.Limits(max_connections=concurrency)) as client:
+        for _ in range(seed_items):
+            client.post("/api/items/", json={"name": f"{prefix}-{next(counter)}", "description": "semilla"})
+
+        # Reparto determinista: cada `1 / write_ratio` peticiones, una es escritura
+        every = max(1, round(1 / write_ratio)) if write_ratio > 0 else 0
+
+        def one(i: int) -> Tuple[float, bool]:
+            start = time.perf_counter()
+            if every and i % every == 0:
+                resp = client.post("/api/items/", json={"name": f"{prefix}-{next(counter)}", "description": "carga"})
+                ok = resp.status_code == 201
+            else:
+                ok = client.get("/api/items/").status_code == 200
+            return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies: List[float] = sorted(latency for latency, _ in results)
+    return {
+        "req_s": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "errors": sum(1 for _, ok in results if not ok),
+    }
+
+
+def _print_row(label: str, stats: Dict[str, float]) -> None:
+    print(f"{label:>26}  {stats['req_s']:>9.1f}  {stats['p50_ms']:>8.1f}  {stats['p99_ms']:>8.1f}  {stats['errors']:>7}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga mixta POST/GET sobre /api/items/.")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed-items", type=int, default=200)
+    parser.add_argument("--url", help="Servidor ya levantado; si se omite se comparan DB_POOL=0 y DB_POOL=1.")
+    args = parser.parse_args()
+    load = (args.requests, args.concurrency, args.write_ratio, args.seed_items)
+
+    print(f"{'':>26}  {'req/s':>9}  {'p50 (ms)':>8}  {'p99 (ms)':>8}  {'errores':>7}")
+    if args.url:
+        _print_row(args.url, run_load(args.url, *load))
+        return
+
+    for label, db_pool in (("antes (conexión por uso)", False), ("después (pool + WAL)", True)):
+        with tempfile.TemporaryDirectory() as workdir:
+            process, url = _start_server(db_pool, workdir)
+            try:
+                _print_row(label, run_load(url, *load))
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
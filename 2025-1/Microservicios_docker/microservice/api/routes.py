@@ -1,11 +1,18 @@
-from typing import List, Optional
+import json
+from typing import AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from microservice.services import business_logic
 from microservice.utils.logger import logger
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Líneas por bloque en el modo NDJSON: se envía un bloque por escritura al socket
+NDJSON_CHUNK_SIZE = 500
+
 router = APIRouter(
     prefix="/api/items",
     tags=["items"]
@@ -30,20 +37,36 @@ class ItemOut(ItemIn):
     id: int = Field(..., description="Identificador único del ítem")
 
 
+class BulkConflict(BaseModel):
+    """
+    Ítem de un lote que no se creó porque su nombre ya existía.
+    """
+    index: int = Field(..., description="Posición del ítem dentro del lote")
+    name: str = Field(..., description="Nombre en conflicto")
+
+
+class BulkResult(BaseModel):
+    """
+    Resultado de una creación en lote.
+    """
+    created: List[ItemOut] = Field(..., description="Ítems creados, en el orden del lote")
+    conflicts: List[BulkConflict] = Field(..., description="Ítems omitidos por nombre repetido")
+
+
 @router.post(
     "/",
     response_model=ItemOut,
     status_code=status.HTTP_201_CREATED,
     summary="Crear un nuevo ítem"
 )
-def create_item(item: ItemIn) -> ItemOut:
+async def create_item(item: ItemIn) -> ItemOut:
     """
     Crea un ítem nuevo usando la lógica de negocio.
     :param item: Datos de entrada para el ítem.
     :return: Ítem creado con su ID asignado.
     """
     try:
-        created = business_logic.create_item(item.name, item.description)
+        created = await business_logic.acreate_item(item.name, item.description)
         return created
     except Exception as exc:
         logger.exception("Error al crear ítem")
@@ -53,22 +76,85 @@ def create_item(item: ItemIn) -> ItemOut:
         )
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear varios ítems en una transacción"
+)
+async def create_items(items: List[ItemIn]) -> BulkResult:
+    """
+    Crea todos los ítems del lote en una sola transacción. Los nombres repetidos
+    no abortan el lote: se devuelven en `conflicts` con su posición.
+    :param items: Lista de ítems a crear.
+    :return: Ítems creados con su ID y conflictos por nombre.
+    """
+    try:
+        return await business_logic.acreate_items([item.model_dump() for item in items])
+    except Exception as exc:
+        logger.exception("Error al crear ítems en lote")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+
+async def _ndjson_chunks(items: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    """
+    Serializa los ítems como NDJSON (un objeto `ItemOut` por línea) en bloques.
+    Las filas salen del cursor ya validadas por el esquema de la tabla, así que se
+    omite la validación de pydantic.
+    """
+    chunk = []
+    async for item in items:
+        chunk.append(
+            json.dumps(
+                {"id": item["id"], "name": item["name"], "description": item["description"]},
+                ensure_ascii=False,
+            ) + "\n"
+        )
+        if len(chunk) == NDJSON_CHUNK_SIZE:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
+
+
 @router.get(
     "/",
     response_model=List[ItemOut],
     status_code=status.HTTP_200_OK,
-    summary="Listar todos los ítems"
+    summary="Listar ítems (paginación por cursor)"
 )
-def list_items() -> List[ItemOut]:
+async def list_items(
+    after_id: Optional[int] = Query(None, ge=0, description="Devuelve solo ítems con id mayor que este"),
+    limit: Optional[int] = Query(None, ge=1, description="Tamaño máximo de la página"),
+    output_format: str = Query(
+        "json", alias="format", pattern="^(json|ndjson)$",
+        description="`ndjson` transmite los ítems línea a línea desde la base"
+    ),
+) -> Response:
     """
-    Recupera la lista de todos los ítems existentes.
-    :return: Lista de ítems.
+    Recupera los ítems ordenados por id, paginando con `after_id` y `limit`.
+    Si la página está completa, la cabecera `X-Next-After-Id` trae el cursor
+    de la siguiente. Sin parámetros devuelve todos los ítems. El JSON sale ya
+    serializado de la caché de la lógica de negocio, sin pasar por `ItemOut`.
+    :return: Lista de ítems, o un stream NDJSON con `format=ndjson`.
     """
     try:
-        return business_logic.get_all_items()
+        if output_format == "ndjson":
+            return StreamingResponse(
+                _ndjson_chunks(business_logic.aiter_items(after_id, limit)),
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+        page = await business_logic.aget_items_page_json(after_id, limit)
     except Exception as exc:
         logger.exception("Error al listar ítems")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno al obtener los ítems"
         )
+    response = Response(content=page.body, media_type="application/json")
+    if page.next_after_id is not None:
+        response.headers["X-Next-After-Id"] = str(page.next_after_id)
+    return response
@@ -2,7 +2,8 @@ from fastapi import FastAPI
 import uvicorn
 
 from microservice.api.routes import router as api_router
-from microservice.services.database import init_db
+from microservice.services.business_logic import close_storage
+from microservice.services.database import close_pool, init_db
 from microservice.utils.logger import logger
 
 
@@ -35,9 +36,12 @@ def get_application() -> FastAPI:
     def on_shutdown() -> None:
         """
         Se ejecuta justo antes de que la aplicación se detenga.
-        Registra el evento de cierre en el log.
+        Registra el evento de cierre en el log, espera las escrituras pendientes
+        y cierra las conexiones del pool.
         """
         logger.info("Deteniendo la aplicación")
+        close_storage()
+        close_pool()
 
     return app
 
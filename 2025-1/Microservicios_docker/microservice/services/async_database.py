@@ -0,0 +1,181 @@
+import asyncio
+import queue
+import threading
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from anyio import to_thread
+
+from microservice.services import database
+from microservice.utils.logger import logger
+
+# Filas que se traen por salto al threadpool al recorrer un cursor
+ITER_BATCH_SIZE = 500
+
+
+class ThreadpoolStorage:
+    """
+    Almacenamiento asíncrono que ejecuta las funciones de `database` en el
+    threadpool de anyio: el mismo trabajo que hacían las rutas síncronas,
+    pero sin atar el event loop.
+    """
+
+    async def add_item(self, name: str, description: Optional[str] = None) -> int:
+        return await to_thread.run_sync(database.add_item, name, description)
+
+    async def add_items(self, items: Sequence[Tuple[str, Optional[str]]]) -> List[Optional[int]]:
+        return await to_thread.run_sync(database.add_items, items)
+
+    async def list_items(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await to_thread.run_sync(database.list_items, after_id, limit)
+
+    async def iter_items(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        # Cada salto al threadpool trae un bloque de filas, no una
+        rows = database.iter_items(after_id, limit, batch_size=ITER_BATCH_SIZE)
+        try:
+            while True:
+                batch = await to_thread.run_sync(lambda: list(islice(rows, ITER_BATCH_SIZE)))
+                if not batch:
+                    return
+                for row in batch:
+                    yield row
+        finally:
+            rows.close()
+
+    def close(self) -> None:
+        pass
+
+
+class _Write:
+    """
+    Escritura pendiente: función de `database` que recibe la conexión y el
+    futuro del event loop que espera su resultado.
+    """
+    __slots__ = ("func", "args", "loop", "future")
+
+    def __init__(self, func: Callable, args: tuple, loop: asyncio.AbstractEventLoop, future: asyncio.Future) -> None:
+        self.func = func
+        self.args = args
+        self.loop = loop
+        self.future = future
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    # El cliente pudo haberse desconectado y cancelado el futuro
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class WriterThreadStorage(ThreadpoolStorage):
+    """
+    Almacenamiento asíncrono con un hilo escritor dedicado.
+
+    Las escrituras se encolan y un único hilo las ejecuta, así nunca compiten
+    por el bloqueo de escritura de SQLite. Las que se acumulan mientras el hilo
+    está ocupado se confirman juntas (group commit): un solo `COMMIT` para hasta
+    `max_batch` escrituras, cada una en su SAVEPOINT para que un nombre repetido
+    solo falle la suya. Las lecturas siguen en el threadpool: en modo WAL no
+    esperan a las escrituras.
+    """
+
+    def __init__(self, max_batch: int = 256) -> None:
+        self._max_batch = max_batch
+        self._queue: "queue.SimpleQueue[Optional[_Write]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    async def add_item(self, name: str, description: Optional[str] = None) -> int:
+        item_id = await self._submit(database.insert_item, name, description)
+        logger.info("Ítem insertado: %s (id=%d)", name, item_id)
+        return item_id
+
+    async def add_items(self, items: Sequence[Tuple[str, Optional[str]]]) -> List[Optional[int]]:
+        ids = await self._submit(database.insert_items, items)
+        logger.info("Lote insertado: %d ítems, %d conflictos", len(ids) - ids.count(None), ids.count(None))
+        return ids
+
+    async def _submit(self, func: Callable, *args: Any) -> Any:
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Write(func, args, loop, future))
+        return await future
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                    thread.start()
+                    self._thread = thread
+
+    def _run(self) -> None:
+        while True:
+            write = self._queue.get()
+            if write is None:
+                return
+            batch = [write]
+            while len(batch) < self._max_batch:
+                try:
+                    write = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if write is None:
+                    self._queue.put(None)  # Se procesa el lote y luego se termina
+                    break
+                batch.append(write)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: List[_Write]) -> None:
+        outcomes: List[Tuple[Any, Optional[BaseException]]] = []
+        try:
+            with database.get_conn() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for write in batch:
+                    conn.execute("SAVEPOINT escritura")
+                    try:
+                        outcomes.append((write.func(conn, *write.args), None))
+                        conn.execute("RELEASE escritura")
+                    except Exception as exc:
+                        conn.execute("ROLLBACK TO escritura")
+                        conn.execute("RELEASE escritura")
+                        outcomes.append((None, exc))
+                conn.commit()
+        except Exception as exc:
+            # Falló la transacción completa: ninguna escritura del lote quedó confirmada
+            logger.exception("Error al confirmar un lote de %d escrituras", len(batch))
+            outcomes = [(None, exc)] * len(batch)
+
+        for write, (result, error) in zip(batch, outcomes):
+            try:
+                write.loop.call_soon_threadsafe(_resolve, write.future, result, error)
+            except RuntimeError:
+                pass  # El event loop que esperaba ya se cerró
+
+    def close(self) -> None:
+        """
+        Procesa las escrituras pendientes y detiene el hilo escritor.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+def create_storage(backend: str) -> ThreadpoolStorage:
+    """
+    Crea el almacenamiento asíncrono indicado por `DB_BACKEND`.
+
+    :param backend: 'threadpool' o 'writer'.
+    :return: Instancia del almacenamiento.
+    """
+    if backend == "writer":
+        return WriterThreadStorage()
+    if backend == "threadpool":
+        return ThreadpoolStorage()
+    raise ValueError(f"DB_BACKEND desconocido: {backend!r} (use 'threadpool' o 'writer')")
@@ -1,32 +1,211 @@
-from typing import Dict, List, Optional
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple
 
 from microservice.services import database
+from microservice.services.async_database import ThreadpoolStorage, create_storage
+from microservice.utils.config import settings
 from microservice.utils.logger import logger
 
+_storage: Optional[ThreadpoolStorage] = None
+_storage_lock = threading.Lock()
 
-def create_item(name: str, description: Optional[str] = None) -> Dict[str, Optional[int or str]]:
+
+class ItemPage(NamedTuple):
     """
-    Crea un nuevo ítem en la base de datos y devuelve su representación.
+    Página de ítems ya serializada como la respuesta JSON de `List[ItemOut]`.
+    """
+    body: bytes
+    next_after_id: Optional[int]  # Cursor de la página siguiente si esta está completa
 
-    :param name: Nombre único del ítem.
-    :param description: Descripción opcional del ítem.
-    :return: Diccionario con los campos 'id', 'name' y 'description'.
+
+class ResponseCache:
     """
-    # Insertar el ítem y obtener su ID
-    item_id = database.add_item(name, description)
+    Caché en proceso de respuestas serializadas, con desalojo LRU y TTL.
+    Además del número de entradas se acota el total de bytes guardados: una
+    página mayor que `max_bytes` no se guarda.
+
+    La invalidación es por versión: `invalidate()` incrementa un contador y las
+    entradas guardadas con una versión anterior dejan de servirse. `put` descarta
+    el valor si la versión cambió mientras se calculaba, así una lectura que
+    empezó antes de una escritura no deja en caché datos previos a ella. Otros
+    procesos (varios workers de uvicorn) no se enteran de la invalidación: el TTL
+    acota cuánto pueden servir datos viejos.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 30.0, max_bytes: int = 64 * 1024 * 1024,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: Hashable) -> Optional[ItemPage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            version, expires_at, value = entry
+            if version != self._version or self._clock() >= expires_at:
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, version: int, value: ItemPage) -> None:
+        if self._ttl <= 0 or len(value.body) > self._max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._discard(key)
+            self._entries[key] = (version, self._clock() + self._ttl, value)
+            self._bytes += len(value.body)
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[2].body)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Devuelve la caché de listados configurada con `CACHE_TTL`, `CACHE_MAX_ENTRIES`
+    y `CACHE_MAX_BYTES`.
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _storage_lock:
+            if _response_cache is None:
+                config = settings()
+                _response_cache = ResponseCache(
+                    config["CACHE_MAX_ENTRIES"], config["CACHE_TTL"], config["CACHE_MAX_BYTES"]
+                )
+    return _response_cache
 
-    # Construir la respuesta
+
+def get_storage() -> ThreadpoolStorage:
+    """
+    Devuelve el almacenamiento asíncrono elegido con `DB_BACKEND`, creándolo
+    la primera vez que se usa.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage(settings()["DB_BACKEND"])
+                logger.info("Almacenamiento de ítems: %s", type(_storage).__name__)
+    return _storage
+
+
+def close_storage() -> None:
+    """
+    Cierra el almacenamiento (p. ej. espera al hilo escritor); se vuelve a crear si se usa otra vez.
+    """
+    global _storage
+    with _storage_lock:
+        storage, _storage = _storage, None
+    if storage is not None:
+        storage.close()
+
+
+def _created_item(item_id: int, name: str, description: Optional[str]) -> Dict[str, Optional[int or str]]:
+    # Construir la respuesta, invalidar los listados cacheados y registrar la operación de negocio
+    get_response_cache().invalidate()
     item = {
         "id": item_id,
         "name": name,
         "description": description,
     }
-
-    # Registrar la operación de negocio
     logger.info("Ítem creado por la lógica de negocio: %s", item)
     return item
 
 
+def _batch_rows(items: List[Dict[str, Optional[str]]]) -> List[Tuple[str, Optional[str]]]:
+    return [(item["name"], item.get("description")) for item in items]
+
+
+def _batch_result(rows: List[Tuple[str, Optional[str]]],
+                  ids: List[Optional[int]]) -> Dict[str, List[Dict[str, Optional[int or str]]]]:
+    if any(item_id is not None for item_id in ids):
+        get_response_cache().invalidate()
+
+    created = []
+    conflicts = []
+    for index, ((name, description), item_id) in enumerate(zip(rows, ids)):
+        if item_id is None:
+            conflicts.append({"index": index, "name": name})
+        else:
+            created.append({"id": item_id, "name": name, "description": description})
+
+    logger.info("Lote procesado por la lógica de negocio: %d creados, %d conflictos", len(created), len(conflicts))
+    return {"created": created, "conflicts": conflicts}
+
+
+def create_item(name: str, description: Optional[str] = None) -> Dict[str, Optional[int or str]]:
+    """
+    Crea un nuevo ítem en la base de datos y devuelve su representación.
+
+    :param name: Nombre único del ítem.
+    :param description: Descripción opcional del ítem.
+    :return: Diccionario con los campos 'id', 'name' y 'description'.
+    """
+    item_id = database.add_item(name, description)
+    return _created_item(item_id, name, description)
+
+
+async def acreate_item(name: str, description: Optional[str] = None) -> Dict[str, Optional[int or str]]:
+    """
+    Versión asíncrona de `create_item` sobre el almacenamiento de `DB_BACKEND`.
+    """
+    item_id = await get_storage().add_item(name, description)
+    return _created_item(item_id, name, description)
+
+
+def create_items(items: List[Dict[str, Optional[str]]]) -> Dict[str, List[Dict[str, Optional[int or str]]]]:
+    """
+    Crea varios ítems en una sola transacción.
+
+    Los nombres que ya existen (o que se repiten dentro del lote) no abortan
+    la operación: se informan como conflictos y el resto se crea igual.
+
+    :param items: Diccionarios con 'name' y, opcionalmente, 'description'.
+    :return: Diccionario con 'created' (ítems con su 'id') y 'conflicts'
+             ('index' dentro del lote y 'name' de cada ítem rechazado).
+    """
+    rows = _batch_rows(items)
+    return _batch_result(rows, database.add_items(rows))
+
+
+async def acreate_items(items: List[Dict[str, Optional[str]]]) -> Dict[str, List[Dict[str, Optional[int or str]]]]:
+    """
+    Versión asíncrona de `create_items` sobre el almacenamiento de `DB_BACKEND`.
+    """
+    rows = _batch_rows(items)
+    return _batch_result(rows, await get_storage().add_items(rows))
+
+
 def get_all_items() -> List[Dict[str, Optional[int or str]]]:
     """
     Recupera todos los ítems existentes en la base de datos.
@@ -41,3 +220,76 @@ def get_all_items() -> List[Dict[str, Optional[int or str]]]:
         logger.exception("Error al recuperar los ítems")
         # En un escenario real, aquí se podría lanzar una excepción HTTP o propia
         return []
+
+
+def get_items(after_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Optional[int or str]]]:
+    """
+    Recupera una página de ítems ordenada por id.
+
+    :param after_id: Cursor: id del último ítem de la página anterior (None para la primera).
+    :param limit: Tamaño máximo de la página (None sin límite).
+    :return: Lista de diccionarios, cada uno con 'id', 'name', 'description' y 'created_at'.
+    """
+    items = database.list_items(after_id, limit)
+    logger.debug("Lógica de negocio obtuvo %d ítems", len(items))
+    return items
+
+
+async def aget_items(after_id: Optional[int] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Optional[int or str]]]:
+    """
+    Versión asíncrona de `get_items` sobre el almacenamiento de `DB_BACKEND`.
+    """
+    items = await get_storage().list_items(after_id, limit)
+    logger.debug("Lógica de negocio obtuvo %d ítems", len(items))
+    return items
+
+
+async def aget_items_page_json(after_id: Optional[int] = None, limit: Optional[int] = None) -> ItemPage:
+    """
+    Igual que `aget_items`, pero devuelve la página ya serializada en JSON y la
+    sirve desde la caché mientras no haya escrituras ni venza el TTL. Un acierto
+    no toca la base ni vuelve a validar con pydantic.
+
+    :param after_id: Cursor: id del último ítem de la página anterior (None para la primera).
+    :param limit: Tamaño máximo de la página (None sin límite).
+    :return: Cuerpo JSON con los campos de `ItemOut` y cursor de la página siguiente.
+    """
+    cache = get_response_cache()
+    key = (after_id or 0, limit)
+    page = cache.get(key)
+    if page is not None:
+        return page
+
+    version = cache.version
+    items = await aget_items(after_id, limit)
+    # Mismo formato que JSONResponse; el orden de claves es el de los campos de ItemOut
+    body = json.dumps(
+        [{"name": item["name"], "description": item["description"], "id": item["id"]} for item in items],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    next_after_id = items[-1]["id"] if limit is not None and len(items) == limit else None
+    page = ItemPage(body, next_after_id)
+    cache.put(key, version, page)
+    return page
+
+
+def iter_items(after_id: Optional[int] = None,
+               limit: Optional[int] = None) -> Iterator[Dict[str, Optional[int or str]]]:
+    """
+    Recorre los ítems sin cargarlos todos en memoria (para respuestas en streaming).
+
+    :param after_id: Cursor: devuelve solo ítems con id mayor que este.
+    :param limit: Máximo de ítems (None sin límite).
+    :return: Iterador de diccionarios con 'id', 'name', 'description' y 'created_at'.
+    """
+    return database.iter_items(after_id, limit)
+
+
+def aiter_items(after_id: Optional[int] = None,
+                limit: Optional[int] = None) -> AsyncIterator[Dict[str, Optional[int or str]]]:
+    """
+    Versión asíncrona de `iter_items` sobre el almacenamiento de `DB_BACKEND`.
+    """
+    return get_storage().iter_items(after_id, limit)
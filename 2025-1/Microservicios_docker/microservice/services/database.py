@@ -1,6 +1,10 @@
+import itertools
+import os
+import threading
+import weakref
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import sqlite3
 
@@ -10,13 +14,142 @@ from microservice.utils.logger import logger
 DB_PATH = Path("app.db")
 
 
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite con una conexión por hilo.
+
+    Una conexión sqlite3 no debe usarse desde dos hilos a la vez, así que cada hilo
+    abre la suya la primera vez que la pide y la reutiliza en adelante. Como las
+    consultas del módulo son cadenas constantes, la caché de sentencias preparadas
+    de cada conexión (`cached_statements`) las compila una sola vez por hilo.
+
+    Las conexiones trabajan en modo WAL: las lecturas no esperan a las escrituras.
+    Cada conexión se cierra cuando termina su hilo (los workers de anyio terminan
+    tras un rato inactivo), así el pool no acumula conexiones de hilos muertos.
+    """
+
+    def __init__(self, path: Path, mmap_size: int, cache_size: int, cached_statements: int = 128) -> None:
+        self.path = Path(path)
+        self.pid = os.getpid()
+        self._mmap_size = mmap_size
+        self._cache_size = cache_size
+        self._cached_statements = cached_statements
+        self._local = threading.local()
+        # Reentrante: el recolector puede correr un finalizador mientras este hilo tiene el lock
+        self._lock = threading.RLock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._tokens = itertools.count()
+
+    @property
+    def size(self) -> int:
+        """
+        Cantidad de conexiones abiertas.
+        """
+        return len(self._connections)
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Devuelve la conexión del hilo actual, abriéndola si todavía no existe.
+        """
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _ThreadConnection(self._connect())
+            token = next(self._tokens)
+            with self._lock:
+                self._connections[token] = holder.conn
+            # El `threading.local` suelta el holder al terminar el hilo y eso cierra la conexión
+            weakref.finalize(holder, self._release, token)
+            self._local.holder = holder
+        return holder.conn
+
+    def _release(self, token: int) -> None:
+        with self._lock:
+            conn = self._connections.pop(token, None)
+        if conn is not None:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False solo para que close_all pueda cerrarla desde otro hilo
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=self._cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        # En WAL, NORMAL solo sincroniza en los checkpoints y sigue siendo consistente ante caídas
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self._mmap_size)}")
+        conn.execute(f"PRAGMA cache_size={int(self._cache_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        logger.debug("Nueva conexión SQLite para el hilo %s", threading.current_thread().name)
+        return conn
+
+    def close_all(self) -> None:
+        """
+        Cierra todas las conexiones abiertas por el pool.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        # Fuera del lock: soltar el local dispara los finalizadores, que también lo toman
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+
+class _ThreadConnection:
+    """
+    Conexión de un hilo; su finalizador la cierra cuando el hilo termina.
+    """
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Devuelve el pool de conexiones de `DB_PATH`, creándolo si hace falta.
+
+    Se recrea si cambia `DB_PATH` o si el proceso es un fork del que lo creó
+    (las conexiones SQLite no deben cruzar un fork).
+    """
+    global _pool
+    pool = _pool
+    if pool is None or pool.path != Path(DB_PATH) or pool.pid != os.getpid():
+        with _pool_lock:
+            pool = _pool
+            if pool is None or pool.path != Path(DB_PATH) or pool.pid != os.getpid():
+                if pool is not None and pool.pid == os.getpid():
+                    pool.close_all()
+                config = settings()
+                pool = ConnectionPool(DB_PATH, config["SQLITE_MMAP_SIZE"], config["SQLITE_CACHE_SIZE"])
+                _pool = pool
+    return pool
+
+
+def close_pool() -> None:
+    """
+    Cierra las conexiones del pool; la siguiente llamada a `get_conn` abre otras.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close_all()
+        _pool = None
+
+
 def init_db() -> None:
     """
     Inicializa la base de datos SQLite creando la tabla `items`
     si no existe todavía.
     """
     logger.info("Inicializando base de datos en %s", DB_PATH)
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_conn() as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS items (
@@ -33,13 +166,43 @@ def init_db() -> None:
 @contextmanager
 def get_conn():
     """
-    Context manager para obtener y cerrar una conexión SQLite.
+    Context manager para obtener una conexión SQLite.
+
+    Con el pool activo (`DB_POOL`, por defecto) entrega la conexión del hilo actual
+    y no la cierra al salir; si hubo una excepción deshace la transacción en curso
+    para no dejarla abierta en la conexión compartida. Con `DB_POOL=0` abre y cierra
+    una conexión nueva en cada llamada.
     """
-    conn = sqlite3.connect(DB_PATH)
+    if not settings()["DB_POOL"]:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    conn = get_pool().connection()
     try:
         yield conn
-    finally:
-        conn.close()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def insert_item(conn: sqlite3.Connection, name: str, description: Optional[str] = None) -> int:
+    """
+    Inserta un ítem usando `conn` sin confirmar la transacción (la confirma quien llama).
+
+    :param conn: Conexión sobre la que se ejecuta el INSERT.
+    :param name: Nombre único del ítem.
+    :param description: Descripción opcional del ítem.
+    :return: ID del ítem insertado.
+    """
+    cursor = conn.execute(
+        "INSERT INTO items (name, description) VALUES (?, ?)",
+        (name, description)
+    )
+    return cursor.lastrowid
 
 
 def add_item(name: str, description: Optional[str] = None) -> int:
@@ -51,37 +214,113 @@ def add_item(name: str, description: Optional[str] = None) -> int:
     :return: ID del ítem insertado.
     """
     with get_conn() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO items (name, description) VALUES (?, ?)",
-            (name, description)
-        )
+        item_id = insert_item(conn, name, description)
         conn.commit()
-        item_id = cursor.lastrowid
         logger.info("Ítem insertado: %s (id=%d)", name, item_id)
         return item_id
 
 
-def list_items() -> List[Dict[str, Optional[str]]]:
+def insert_items(conn: sqlite3.Connection, items: Sequence[Tuple[str, Optional[str]]]) -> List[Optional[int]]:
+    """
+    Inserta varios ítems con `executemany` sin confirmar la transacción.
+
+    Los nombres repetidos (ya existentes o duplicados dentro del lote) no abortan el
+    lote: se omiten y su posición devuelve None. Dentro del lote gana la primera
+    aparición. Los IDs se obtienen con una sola consulta por rango de id: con
+    AUTOINCREMENT los nuevos son mayores que el máximo previo. Quien llama debe
+    tener ya el bloqueo de escritura (`BEGIN IMMEDIATE`) para que ningún otro
+    escritor inserte entre ambas lecturas.
+
+    :param conn: Conexión con una transacción de escritura abierta.
+    :param items: Pares (nombre, descripción).
+    :return: ID asignado a cada ítem, en el mismo orden, o None si hubo conflicto.
+    """
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM items").fetchone()[0]
+    conn.executemany(
+        "INSERT OR IGNORE INTO items (name, description) VALUES (?, ?)",
+        items
+    )
+    inserted = dict(
+        conn.execute("SELECT name, id FROM items WHERE id > ?", (last_id,)).fetchall()
+    )
+    # `pop` asigna cada ID una sola vez: las repeticiones posteriores quedan en None
+    return [inserted.pop(name, None) for name, _ in items]
+
+
+def add_items(items: Sequence[Tuple[str, Optional[str]]]) -> List[Optional[int]]:
+    """
+    Inserta varios ítems en una sola transacción (ver `insert_items`).
+
+    :param items: Pares (nombre, descripción).
+    :return: ID asignado a cada ítem, en el mismo orden, o None si hubo conflicto.
+    """
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        ids = insert_items(conn, items)
+        conn.commit()
+
+    logger.info("Lote insertado: %d ítems, %d conflictos", len(ids) - ids.count(None), ids.count(None))
+    return ids
+
+
+# Keyset: `id > ?` usa la clave primaria, así el costo no crece con la página pedida.
+# LIMIT -1 es "sin límite" en SQLite; con una sola cadena la sentencia preparada se reutiliza.
+_LIST_ITEMS_SQL = (
+    "SELECT id, name, description, created_at FROM items WHERE id > ? ORDER BY id LIMIT ?"
+)
+
+
+def _row_to_dict(row: tuple) -> Dict[str, Optional[str]]:
+    return {
+        "id": row[0],
+        "name": row[1],
+        "description": row[2],
+        "created_at": row[3],
+    }
+
+
+def list_items(after_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Optional[str]]]:
     """
-    Recupera todos los ítems de la tabla `items`.
+    Recupera ítems de la tabla `items` ordenados por id (paginación por cursor).
 
+    :param after_id: Devuelve solo ítems con id mayor que este; None desde el principio.
+    :param limit: Máximo de ítems a devolver; None sin límite.
     :return: Lista de diccionarios con keys id, name, description y created_at.
     """
     with get_conn() as conn:
-        cursor = conn.execute(
-            "SELECT id, name, description, created_at FROM items"
-        )
-        rows = cursor.fetchall()
-
-    result = [
-        {
-            "id": row[0],
-            "name": row[1],
-            "description": row[2],
-            "created_at": row[3],
-        }
-        for row in rows
-    ]
-    logger.debug("Listado de ítems: %s", result)
+        rows = conn.execute(
+            _LIST_ITEMS_SQL,
+            (after_id or 0, -1 if limit is None else limit)
+        ).fetchall()
+
+    result = [_row_to_dict(row) for row in rows]
+    logger.debug("Listado de ítems: %d (after_id=%s, limit=%s)", len(result), after_id, limit)
     return result
+
+
+def iter_items(after_id: Optional[int] = None, limit: Optional[int] = None,
+               batch_size: int = 500) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Recorre los ítems directamente desde el cursor, sin materializar la lista.
+
+    Usa una conexión propia que se cierra al agotar o descartar el generador: quien
+    lo consume (p. ej. una respuesta en streaming) puede avanzar desde distintos
+    hilos, y la conexión del pool de cada hilo no debe compartirse. En modo WAL la
+    lectura ve una instantánea consistente y no bloquea a los escritores.
+
+    :param after_id: Devuelve solo ítems con id mayor que este; None desde el principio.
+    :param limit: Máximo de ítems a devolver; None sin límite.
+    :param batch_size: Filas que se traen del cursor en cada `fetchmany`.
+    :return: Iterador de diccionarios con keys id, name, description y created_at.
+    """
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    try:
+        cursor = conn.execute(_LIST_ITEMS_SQL, (after_id or 0, -1 if limit is None else limit))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield _row_to_dict(row)
+    finally:
+        conn.close()
@@ -19,5 +19,19 @@ def settings() -> Dict[str, Any]:
         "DEBUG": os.getenv("DEBUG", "0") == "1",
         # URL de la base de datos, p.ej. 'sqlite:///./app.db'
         "DATABASE_URL": os.getenv("DATABASE_URL", "sqlite:///./app.db"),
+        # Pool de conexiones SQLite por hilo con WAL: DB_POOL="0" vuelve a una conexión por llamada
+        "DB_POOL": os.getenv("DB_POOL", "1") == "1",
+        # Almacenamiento de las rutas async: 'threadpool' (funciones de database.py en
+        # hilos de anyio) o 'writer' (hilo escritor dedicado con group commit)
+        "DB_BACKEND": os.getenv("DB_BACKEND", "threadpool"),
+        # Caché de listados en business_logic: segundos de vida (0 la desactiva), entradas
+        # máximas y bytes máximos entre todas las entradas
+        "CACHE_TTL": float(os.getenv("CACHE_TTL", "30")),
+        "CACHE_MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "128")),
+        "CACHE_MAX_BYTES": int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        # Bytes de la base que SQLite puede leer vía mmap (0 lo deshabilita)
+        "SQLITE_MMAP_SIZE": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # Caché de páginas por conexión; negativo = KiB (criterio de SQLite)
+        "SQLITE_CACHE_SIZE": int(os.getenv("SQLITE_CACHE_SIZE", "-16000")),
     }
     return settings
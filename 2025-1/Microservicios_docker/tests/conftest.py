@@ -5,3 +5,17 @@ from pathlib import Path
 # Inserta la carpeta raíz (donde está microservice/) al path de importación
 root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(root))
+
+
+import pytest
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Base vacía en un directorio temporal; el pool se cierra al terminar."""
+    from microservice.services import database
+
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "app.db")
+    database.init_db()
+    yield database
+    database.close_pool()
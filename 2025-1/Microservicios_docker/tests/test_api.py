@@ -5,15 +5,22 @@ Se asume que la lógica de negocio está en microservice/main.py y que
 FastAPI registra las rutas en /api/items.
 """
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from microservice.main import app
+from microservice.services import business_logic
 
 # Fixtures
 
-@pytest.fixture(scope="module")
-def client():
-    """Cliente síncrono sobre la app ASGI (Starlette+FastAPI)."""
+@pytest.fixture
+def client(db, monkeypatch):
+    """
+    Cliente síncrono sobre la app ASGI (Starlette+FastAPI), con una base vacía
+    temporal (fixture `db`) y la caché de listados vacía.
+    """
+    monkeypatch.setattr(business_logic, "_response_cache", None)
     with TestClient(app) as c:
         yield c
 
@@ -50,3 +57,63 @@ def test_create_item_and_verify_in_list(client):
     assert any(i["name"] == ITEM_NAME for i in items), (
         f"El ítem '{ITEM_NAME}' debería figurar en la lista"
     )
+
+
+def _create_items(client, count):
+    """Crea `count` ítems y devuelve sus respuestas."""
+    return [
+        client.post("/api/items", json={"name": f"item-{i}"}).json()
+        for i in range(count)
+    ]
+
+
+def test_list_items_keyset_pagination(client):
+    """`after_id` + `limit` recorren los ítems en orden y la cabecera trae el siguiente cursor."""
+    created = _create_items(client, 3)
+
+    first = client.get("/api/items", params={"limit": 2})
+    assert first.status_code == 200
+    assert first.json() == created[:2]
+    assert first.headers["X-Next-After-Id"] == str(created[1]["id"])
+
+    second = client.get("/api/items", params={"after_id": first.headers["X-Next-After-Id"], "limit": 2})
+    assert second.json() == created[2:]
+    assert "X-Next-After-Id" not in second.headers
+
+    assert client.get("/api/items", params={"limit": 0}).status_code == 422
+
+
+def test_list_items_ndjson_stream(client):
+    """Con `format=ndjson` cada línea es un ítem con la forma de ItemOut."""
+    created = _create_items(client, 3)
+    resp = client.get("/api/items", params={"format": "ndjson"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    assert [json.loads(line) for line in resp.text.splitlines()] == created
+
+    resp = client.get("/api/items", params={"after_id": created[0]["id"], "format": "ndjson"})
+    assert [json.loads(line) for line in resp.text.splitlines()] == created[1:]
+
+
+def test_bulk_create_reports_conflicts_without_aborting(client):
+    """Los nombres repetidos se informan por posición y el resto del lote se crea."""
+    existing = _create_items(client, 1)[0]
+    batch = [
+        {"name": "lote-a", "description": "uno"},
+        {"name": existing["name"]},
+        {"name": "lote-b"},
+        {"name": "lote-a"},
+    ]
+
+    resp = client.post("/api/items/bulk", json=batch)
+    assert resp.status_code == 201
+    body = resp.json()
+
+    assert [(i["name"], i["description"]) for i in body["created"]] == [("lote-a", "uno"), ("lote-b", None)]
+    assert existing["id"] < body["created"][0]["id"] < body["created"][1]["id"]
+    assert body["conflicts"] == [
+        {"index": 1, "name": existing["name"]},
+        {"index": 3, "name": "lote-a"},
+    ]
+    assert client.get("/api/items").json() == [existing] + body["created"]
@@ -0,0 +1,53 @@
+"""
+Pruebas de los almacenamientos asíncronos de microservice/services/async_database.py.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+from microservice.services.async_database import ThreadpoolStorage, WriterThreadStorage, create_storage
+
+
+def test_writer_groups_concurrent_writes_and_isolates_conflicts(db):
+    storage = WriterThreadStorage()
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(storage.add_item(f"item{i}") for i in range(50)),
+            storage.add_item("item0"),
+            storage.add_items([("lote-a", None), ("item1", None), ("lote-b", "b")]),
+            return_exceptions=True,
+        )
+        listed = await storage.list_items()
+        streamed = [row async for row in storage.iter_items()]
+        return results, listed, streamed
+
+    try:
+        results, listed, streamed = asyncio.run(scenario())
+    finally:
+        storage.close()
+
+    singles, duplicate, batch = results[:50], results[50], results[51]
+    assert all(isinstance(item_id, int) for item_id in singles)
+    assert isinstance(duplicate, sqlite3.IntegrityError)
+    assert batch[1] is None and None not in (batch[0], batch[2])
+    assert len(listed) == 52
+    assert streamed == listed
+
+
+def test_threadpool_storage_matches_database(db):
+    storage = ThreadpoolStorage()
+
+    async def scenario():
+        item_id = await storage.add_item("uno", "desc")
+        return item_id, await storage.list_items(), [row async for row in storage.iter_items()]
+
+    item_id, listed, streamed = asyncio.run(scenario())
+    assert listed == streamed == db.list_items()
+    assert listed[0]["id"] == item_id
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_storage("otro")
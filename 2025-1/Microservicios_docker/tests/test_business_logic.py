@@ -0,0 +1,112 @@
+"""
+Pruebas de la caché de listados de microservice/services/business_logic.py.
+"""
+
+import asyncio
+import json
+
+import pytest
+from microservice.services import business_logic
+from microservice.services.business_logic import ItemPage, ResponseCache
+
+
+class CountingStorage:
+    """Almacenamiento en memoria que cuenta las lecturas."""
+
+    def __init__(self):
+        self.items = []
+        self.reads = 0
+
+    async def add_item(self, name, description=None):
+        self.items.append({"id": len(self.items) + 1, "name": name, "description": description, "created_at": None})
+        return len(self.items)
+
+    async def list_items(self, after_id=None, limit=None):
+        self.reads += 1
+        page = [item for item in self.items if item["id"] > (after_id or 0)]
+        return page if limit is None else page[:limit]
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    fake = CountingStorage()
+    monkeypatch.setattr(business_logic, "_storage", fake)
+    monkeypatch.setattr(business_logic, "_response_cache", ResponseCache(max_entries=2, ttl=60))
+    return fake
+
+
+def test_listing_is_cached_until_an_item_is_created(storage):
+    async def scenario():
+        await business_logic.acreate_item("uno")
+        first = await business_logic.aget_items_page_json()
+        second = await business_logic.aget_items_page_json()
+        await business_logic.acreate_item("dos")
+        third = await business_logic.aget_items_page_json()
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert second is first
+    assert json.loads(first.body) == [{"name": "uno", "description": None, "id": 1}]
+    assert [item["name"] for item in json.loads(third.body)] == ["uno", "dos"]
+    assert storage.reads == 2
+
+
+def test_pages_carry_next_cursor(storage):
+    async def scenario():
+        for name in ("a", "b", "c"):
+            await business_logic.acreate_item(name)
+        return (await business_logic.aget_items_page_json(limit=2),
+                await business_logic.aget_items_page_json(after_id=2, limit=2))
+
+    full, last = asyncio.run(scenario())
+    assert full.next_after_id == 2
+    assert last.next_after_id is None
+
+
+def test_cache_evicts_lru_expires_and_ignores_stale_puts():
+    now = [0.0]
+    cache = ResponseCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    page = ItemPage(b"[]", None)
+
+    cache.put("a", cache.version, page)
+    cache.put("b", cache.version, page)
+    cache.get("a")
+    cache.put("c", cache.version, page)
+    assert cache.get("b") is None and cache.get("a") is page
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+
+    stale_version = cache.version
+    cache.invalidate()
+    cache.put("d", stale_version, page)
+    assert cache.get("d") is None
+
+
+def test_cache_bounds_total_bytes():
+    cache = ResponseCache(max_entries=10, ttl=60, max_bytes=10)
+    small, big = ItemPage(b"[1,2]", None), ItemPage(b"[1,2,3,4,5]", None)
+
+    cache.put("a", cache.version, small)
+    cache.put("b", cache.version, small)
+    cache.put("c", cache.version, small)
+    assert cache.get("a") is None and cache.get("c") is small
+
+    cache.put("d", cache.version, big)
+    assert cache.get("d") is None and cache.get("b") is small
+
+
+def test_sync_interface_returns_results_and_invalidates(db, monkeypatch):
+    monkeypatch.setattr(business_logic, "_response_cache", ResponseCache(ttl=60))
+
+    created = business_logic.create_item("uno", "desc")
+    assert created == {"id": 1, "name": "uno", "description": "desc"}
+    version = business_logic.get_response_cache().version
+
+    batch = business_logic.create_items([{"name": "dos"}, {"name": "uno"}])
+    assert [item["name"] for item in batch["created"]] == ["dos"]
+    assert batch["conflicts"] == [{"index": 1, "name": "uno"}]
+    assert business_logic.get_response_cache().version > version
+
+    assert [item["name"] for item in business_logic.get_items()] == ["uno", "dos"]
+    assert business_logic.get_all_items() == list(business_logic.iter_items())
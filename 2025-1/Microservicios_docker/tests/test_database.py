@@ -0,0 +1,74 @@
+"""
+Pruebas del pool de conexiones SQLite de microservice/services/database.py.
+"""
+
+import threading
+
+import pytest
+
+
+def test_pool_reuses_connection_per_thread_in_wal_mode(db):
+    with db.get_conn() as first, db.get_conn() as second:
+        assert first is second
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert first.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.get_pool().connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+
+def test_failed_insert_does_not_leave_transaction_open(db):
+    db.add_item("repetido")
+    with pytest.raises(Exception):
+        db.add_item("repetido")
+    with db.get_conn() as conn:
+        assert not conn.in_transaction
+
+    db.add_item("otro")
+    assert [item["name"] for item in db.list_items()] == ["repetido", "otro"]
+
+
+def test_concurrent_writers_and_readers(db):
+    errors = []
+
+    def work(n):
+        try:
+            for i in range(20):
+                db.add_item(f"hilo{n}-{i}")
+                db.list_items()
+        except Exception as exc:  # pragma: no cover - solo se reporta
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(db.list_items()) == 80
+
+
+def test_keyset_listing_and_cursor_iteration_agree(db):
+    ids = [db.add_item(f"item{i}") for i in range(5)]
+
+    assert [item["id"] for item in db.list_items(after_id=ids[1], limit=2)] == ids[2:4]
+    assert [item["id"] for item in db.iter_items(after_id=ids[1], limit=2, batch_size=1)] == ids[2:4]
+    assert list(db.iter_items(after_id=ids[-1])) == []
+    assert db.list_items() == list(db.iter_items())
+
+
+def test_connections_are_closed_when_their_threads_exit(db):
+    pool = db.get_pool()
+    db.list_items()
+    assert pool.size == 1
+
+    threads = [threading.Thread(target=db.list_items) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert pool.size == 1  # Solo la del hilo principal
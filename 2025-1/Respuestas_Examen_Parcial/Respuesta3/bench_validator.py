@@ -0,0 +1,324 @@
+"""
+Benchmark y perfilado de los RuleProcessor (legacy y refactorizado).
+
+Uso:
+    python bench_validator.py [--items 1000000 --rules 50 --skew 1.0 --pass-rate 0.3]
+                              [--operators gt lt eq_int eq_str contains has_key]
+                              [--modes legacy compilado indexado ...] [--workers 4]
+                              [--per-rule 10] [--memory]
+                              [--save-baseline base.json | --baseline base.json --threshold 0.2]
+
+Genera un conjunto de reglas y un dataset sintéticos. Una fracción `--pass-rate` de los
+elementos se construye para cumplir alguna regla, elegida con una distribución Zipf de
+exponente `--skew` (0 = uniforme; cuanto mayor, más se concentran en pocas reglas); el resto
+no cumple ninguna. Cada regla se expresa en el DSL del módulo refactorizado y como expresión
+de Python para el legacy, con la misma semántica sobre estos datos.
+
+Por modo se informa tiempo, items/s y, con `--memory`, el pico de memoria de Python
+(tracemalloc, en una segunda ejecución; no incluye a los procesos worker). `--per-rule N`
+lista las N reglas más caras. Con `--baseline` el proceso termina con código 1 si algún modo
+rinde más de `--threshold` por debajo de la línea base guardada con `--save-baseline`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, NamedTuple
+
+from validator_module_legacy import RuleProcessor as LegacyRuleProcessor
+from validator_module_refactored import (
+    AsyncRuleProcessor,
+    ParallelRuleProcessor,
+    RuleProcessor,
+    SafeConditionEvaluator,
+)
+
+
+OPERATORS = ("gt", "lt", "eq_int", "eq_str", "contains", "has_key")
+
+
+class RuleSpec(NamedTuple):
+    """Regla sintética; se traduce al DSL y a una expresión legacy equivalentes."""
+    id: str
+    kind: str # Uno de OPERATORS
+    operand: int
+
+
+class Scenario(NamedTuple):
+    rules: list[SimpleNamespace] # DSL del módulo refactorizado
+    legacy_rules: list[dict[str, Any]] # Expresiones de Python del legacy
+    items: list[dict[str, Any]]
+
+
+class _Unavailable(Exception):
+    """El modo no se puede ejecutar en este entorno o con este dataset."""
+
+
+class _StaticSource:
+    """Fuente de reglas y configuración en memoria."""
+    def __init__(self, rules: list[SimpleNamespace], config: dict[str, Any]):
+        self._rules = rules
+        self._config = config
+
+    def get_rules(self) -> list[SimpleNamespace]:
+        return self._rules
+
+    def get_config(self) -> dict[str, Any]:
+        return self._config
+
+
+class _InterpretingEvaluator:
+    """Expone solo `evaluate`, así el procesador no puede compilar las condiciones."""
+    def __init__(self):
+        self._inner = SafeConditionEvaluator()
+
+    def evaluate(self, condition_str: str, item: dict[str, Any]) -> bool:
+        return self._inner.evaluate(condition_str, item)
+
+
+# ---------------------------------------------------------------------------
+# Datos sintéticos
+# ---------------------------------------------------------------------------
+
+def make_rule_specs(count: int, operators: tuple[str, ...] = OPERATORS) -> list[RuleSpec]:
+    return [RuleSpec(f"R{i:05d}", operators[i % len(operators)], 1000 + i) for i in range(count)]
+
+
+def dsl_condition(spec: RuleSpec) -> str:
+    return {
+        "gt": f"value > {spec.operand}",
+        "lt": f"value < -{spec.operand}",
+        "eq_int": f"code == {spec.operand}",
+        "eq_str": f"name == 'user{spec.operand}'",
+        "contains": f"status contains 'flag{spec.operand}'",
+        "has_key": f"extra{spec.operand} has_key",
+    }[spec.kind]
+
+
+def legacy_condition(spec: RuleSpec) -> str:
+    return {
+        "gt": f"'value' in item and item['value'] > {spec.operand}",
+        "lt": f"'value' in item and item['value'] < -{spec.operand}",
+        "eq_int": f"'code' in item and item['code'] == {spec.operand}",
+        "eq_str": f"'name' in item and item['name'] == 'user{spec.operand}'",
+        "contains": f"'status' in item and 'flag{spec.operand}' in item['status']",
+        "has_key": f"'extra{spec.operand}' in item",
+    }[spec.kind]
+
+
+def _satisfy(item: dict[str, Any], spec: RuleSpec, rng: random.Random) -> None:
+    """Modifica `item` para que cumpla `spec`."""
+    if spec.kind == "gt":
+        item["value"] = spec.operand + 1 + rng.randrange(10)
+    elif spec.kind == "lt":
+        item["value"] = -spec.operand - 1 - rng.randrange(10)
+    elif spec.kind == "eq_int":
+        item["code"] = spec.operand
+    elif spec.kind == "eq_str":
+        item["name"] = f"user{spec.operand}"
+    elif spec.kind == "contains":
+        item["status"] += f"-flag{spec.operand}"
+    else:
+        item[f"extra{spec.operand}"] = 1
+
+
+def build_scenario(
+    items: int,
+    rules: int,
+    skew: float = 1.0,
+    pass_rate: float = 0.3,
+    seed: int = 0,
+    operators: tuple[str, ...] = OPERATORS,
+) -> Scenario:
+    rng = random.Random(seed)
+    specs = make_rule_specs(rules, operators)
+    # Las reglas "calientes" quedan repartidas al azar en el orden de evaluación
+    ranks = list(range(rules))
+    rng.shuffle(ranks)
+    weights = [1.0 / (rank + 1) ** skew for rank in ranks]
+
+    data = []
+    for _ in range(items):
+        # Los valores base no cumplen ninguna regla: todos los operandos son >= 1000
+        item = {
+            "value": rng.randrange(900),
+            "code": -1 - rng.randrange(1000),
+            "name": f"anon{rng.randrange(1000)}",
+            "status": rng.choice(["active", "inactive", "pending"]),
+        }
+        if specs and rng.random() < pass_rate:
+            _satisfy(item, rng.choices(specs, weights)[0], rng)
+        data.append(item)
+
+    return Scenario(
+        [SimpleNamespace(id=spec.id, condition=dsl_condition(spec), description=None) for spec in specs],
+        [{"id": spec.id, "condition": legacy_condition(spec), "description": None} for spec in specs],
+        data,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Modos de evaluación: cada uno retorna cuántos elementos pasaron
+# ---------------------------------------------------------------------------
+
+def _refactored(scenario: Scenario, evaluator: Any = None, **options: Any) -> RuleProcessor:
+    source = _StaticSource(scenario.rules, {"version": "bench"})
+    return RuleProcessor(source, source, evaluator or SafeConditionEvaluator(), **options)
+
+
+def run_legacy(scenario: Scenario, workers: int) -> int:
+    logging.getLogger("LegacyRuleProcessor").disabled = True # Una línea de log por fallo distorsiona la medición
+    processor = LegacyRuleProcessor()
+    processor._rules = scenario.legacy_rules
+    return len(processor.process_rules(scenario.items))
+
+
+def run_columnar(scenario: Scenario, workers: int) -> int:
+    try:
+        import numpy as np
+    except ImportError:
+        raise _Unavailable("requiere NumPy") from None
+    names = set(scenario.items[0]) if scenario.items else set()
+    if any(set(item) != names for item in scenario.items):
+        raise _Unavailable("requiere filas con las mismas claves (use --operators sin has_key)")
+    # La conversión a columnas también se mide: el resto de modos recibe la misma lista de dicts
+    batch = {name: np.array([item[name] for item in scenario.items]) for name in names}
+    return len(_refactored(scenario).process_columns(batch)["value"])
+
+
+def run_async(scenario: Scenario, workers: int) -> int:
+    source = _StaticSource(scenario.rules, {"version": "bench"})
+    processor = AsyncRuleProcessor(source, source, SafeConditionEvaluator(), batch_size=10_000)
+    return len(asyncio.run(processor.process_rules(scenario.items)))
+
+
+def run_parallel(scenario: Scenario, workers: int) -> int:
+    source = _StaticSource(scenario.rules, {"version": "bench"})
+    return len(ParallelRuleProcessor(source, source, SafeConditionEvaluator(), workers=workers).process_rules(scenario.items))
+
+
+MODES: dict[str, Callable[[Scenario, int], int]] = {
+    "legacy": run_legacy,
+    "interpretado": lambda scenario, workers: len(_refactored(scenario, _InterpretingEvaluator()).process_rules(scenario.items)),
+    "compilado": lambda scenario, workers: len(_refactored(scenario).process_rules(scenario.items)),
+    "streaming": lambda scenario, workers: sum(1 for _ in _refactored(scenario).iter_process_rules(scenario.items)),
+    "adaptativo": lambda scenario, workers: len(_refactored(scenario, adaptive=True).process_rules(scenario.items)),
+    "indexado": lambda scenario, workers: len(_refactored(scenario, indexed=True).process_rules(scenario.items)),
+    "paralelo": run_parallel,
+    "async": run_async,
+    "columnar": run_columnar,
+}
+
+
+def measure(mode: str, scenario: Scenario, workers: int, memory: bool) -> tuple[float, int, int | None]:
+    """Tiempo, elementos válidos y (opcionalmente) pico de memoria de Python en bytes."""
+    start = time.perf_counter()
+    passed = MODES[mode](scenario, workers)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        # Segunda ejecución: tracemalloc ralentiza la evaluación y distorsionaría el tiempo
+        tracemalloc.start()
+        try:
+            MODES[mode](scenario, workers)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return elapsed, passed, peak
+
+
+def rule_costs(scenario: Scenario, sample: int = 2000) -> list[tuple[str, float, float]]:
+    """(id, costo medio en segundos, tasa de aciertos) de cada regla sobre una muestra de elementos."""
+    evaluator = SafeConditionEvaluator()
+    items = scenario.items[:sample]
+    costs = []
+    for rule in scenario.rules:
+        predicate = evaluator.compile(rule.condition)
+        start = time.perf_counter()
+        hits = sum(1 for item in items if predicate(item))
+        elapsed = time.perf_counter() - start
+        costs.append((rule.id, elapsed / max(len(items), 1), hits / max(len(items), 1)))
+    return sorted(costs, key=lambda entry: entry[1], reverse=True)
+
+
+def compare_with_baseline(throughput: dict[str, float], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Mensajes de los modos cuyo rendimiento cayó más de `threshold` respecto de la línea base."""
+    regressions = []
+    for mode, reference in baseline["items_per_sec"].items():
+        current = throughput.get(mode)
+        if current is not None and current < reference * (1 - threshold):
+            drop = 1 - current / reference
+            regressions.append(f"REGRESIÓN en {mode}: {current:,.0f} items/s frente a {reference:,.0f} (-{drop:.0%})")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de los RuleProcessor legacy y refactorizado.")
+    parser.add_argument("--items", type=int, default=10 ** 6)
+    parser.add_argument("--rules", type=int, default=50)
+    parser.add_argument("--skew", type=float, default=1.0, help="Exponente Zipf de las reglas que cumplen los elementos.")
+    parser.add_argument("--pass-rate", type=float, default=0.3, help="Fracción de elementos construidos para pasar.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--operators", nargs="+", choices=OPERATORS, default=list(OPERATORS))
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--per-rule", type=int, default=0, metavar="N", help="Muestra las N reglas más caras.")
+    parser.add_argument("--memory", action="store_true", help="Mide el pico de memoria con tracemalloc.")
+    parser.add_argument("--save-baseline", metavar="RUTA")
+    parser.add_argument("--baseline", metavar="RUTA")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Caída tolerada respecto de la línea base (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    params = {
+        "items": args.items, "rules": args.rules, "skew": args.skew,
+        "pass_rate": args.pass_rate, "seed": args.seed, "operators": args.operators,
+    }
+    scenario = build_scenario(args.items, args.rules, args.skew, args.pass_rate, args.seed, tuple(args.operators))
+
+    print(f"{'modo':>12}  {'tiempo (s)':>10}  {'items/s':>12}  {'válidos':>8}  {'memoria (MiB)':>13}")
+    throughput: dict[str, float] = {}
+    results = set()
+    for mode in args.modes:
+        try:
+            elapsed, passed, peak = measure(mode, scenario, args.workers, args.memory)
+        except _Unavailable as reason:
+            print(f"{mode:>12}  ({reason})")
+            continue
+        results.add(passed)
+        throughput[mode] = args.items / elapsed
+        memory = f"{peak / 2 ** 20:>13.1f}" if peak is not None else f"{'-':>13}"
+        print(f"{mode:>12}  {elapsed:>10.2f}  {throughput[mode]:>12,.0f}  {passed:>8}  {memory}")
+    if len(results) > 1:
+        raise SystemExit("Los modos no aceptaron los mismos elementos.")
+
+    if args.per_rule:
+        print(f"\n{'regla':>8}  {'condición':<32}  {'costo (us)':>10}  {'aciertos':>8}")
+        conditions = {rule.id: rule.condition for rule in scenario.rules}
+        for rule_id, cost, hit_rate in rule_costs(scenario)[:args.per_rule]:
+            print(f"{rule_id:>8}  {conditions[rule_id]:<32}  {cost * 1e6:>10.3f}  {hit_rate:>8.1%}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fp:
+            json.dump({"params": params, "items_per_sec": throughput}, fp, indent=2)
+        print(f"\nLínea base guardada en {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        if baseline.get("params") != params:
+            print("\nAdvertencia: la línea base se midió con otros parámetros.")
+        regressions = compare_with_baseline(throughput, baseline, args.threshold)
+        for message in regressions:
+            print(message)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
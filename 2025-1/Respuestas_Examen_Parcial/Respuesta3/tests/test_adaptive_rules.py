@@ -0,0 +1,57 @@
+"""Pruebas del modo adaptativo (reordenamiento de reglas) de RuleProcessor."""
+from __future__ import annotations
+
+import random
+from typing import Any
+
+from validator_module_refactored import RuleProcessor, SafeConditionEvaluator
+from conftest import MemoryConfigSource, MemoryRuleSource
+
+
+RULES = [
+    {"id": "RARA", "condition": "name == 'nunca'"},
+    {"id": "MEDIA", "condition": "status contains 'act'"},
+    {"id": "FRECUENTE", "condition": "value > 10"},
+]
+
+
+def _data(count: int) -> list[dict[str, Any]]:
+    rng = random.Random(4)
+    return [
+        {"value": rng.randrange(100), "name": rng.choice(["a", "b"]), "status": rng.choice(["active", "off"])}
+        for _ in range(count)
+    ]
+
+
+def _processor(**options: Any) -> RuleProcessor:
+    return RuleProcessor(MemoryRuleSource(RULES), MemoryConfigSource({}), SafeConditionEvaluator(), **options)
+
+
+def test_adaptive_mode_keeps_the_passing_items():
+    data = _data(2000)
+    assert _processor(adaptive=True, reorder_every=50).process_rules(data) == _processor().process_rules(data)
+
+
+def test_frequent_rule_moves_first_and_stats_are_consistent():
+    data = _data(3000)
+    processor = _processor(adaptive=True, reorder_every=100)
+    passed = processor.process_rules(data)
+
+    stats = processor.rule_stats()
+    assert stats[0].rule_id == "FRECUENTE"
+    assert stats[-1].rule_id == "RARA"
+    assert sum(rule.hits for rule in stats) == len(passed)
+    assert all(rule.evaluations >= rule.hits and rule.mean_cost > 0 for rule in stats)
+    # Con la regla frecuente primero se evalúan muchas menos reglas que en el orden original
+    assert sum(rule.evaluations for rule in stats) < 2 * len(data)
+
+
+def test_stats_persist_across_calls_until_reset():
+    processor = _processor(adaptive=True)
+    processor.process_rules(_data(10))
+    processor.process_rules(_data(10))
+    assert sum(rule.evaluations for rule in processor.rule_stats()) >= 20
+
+    processor.reset_rule_stats()
+    assert processor.rule_stats() == []
+    assert _processor().process_rules(_data(5)) and _processor().rule_stats() == []
@@ -0,0 +1,110 @@
+"""Pruebas del AsyncRuleProcessor."""
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterable
+
+from validator_module_refactored import (
+    AsyncConfigSource,
+    AsyncRuleProcessor,
+    AsyncRuleSource,
+    RuleProcessor,
+    SafeConditionEvaluator,
+)
+from conftest import ListCapturingLogger
+
+
+class RemoteRules:
+    def __init__(self, rules_data: list[dict[str, Any]], delay: float = 0.0):
+        self._rules = [SimpleNamespace(id=d["id"], condition=d["condition"], description=None) for d in rules_data]
+        self._delay = delay
+
+    async def get_rules(self) -> Iterable[Any]:
+        await asyncio.sleep(self._delay)
+        return self._rules
+
+
+class RemoteConfig:
+    def __init__(self, config: dict[str, Any], delay: float = 0.0):
+        self._config = config
+        self._delay = delay
+
+    async def get_config(self) -> dict[str, Any]:
+        await asyncio.sleep(self._delay)
+        return self._config
+
+
+def _data() -> list[Any]:
+    return [{"value": 15}, {"value": 1}, "no es dict", {"name": "ok"}, {"status": "active"}] * 7
+
+
+async def _stream(items: list[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+def test_async_results_and_logs_match_sync(sample_rules_data, sample_config_data, memory_rule_source, memory_config_source):
+    assert isinstance(RemoteRules([]), AsyncRuleSource)
+    assert isinstance(RemoteConfig({}), AsyncConfigSource)
+    sync_logger, async_logger = ListCapturingLogger(), ListCapturingLogger()
+    expected = RuleProcessor(memory_rule_source, memory_config_source, SafeConditionEvaluator(), sync_logger).process_rules(_data())
+
+    processor = AsyncRuleProcessor(
+        RemoteRules(sample_rules_data), RemoteConfig(sample_config_data), SafeConditionEvaluator(), async_logger, batch_size=4,
+    )
+    assert asyncio.run(processor.process_rules(_stream(_data()))) == expected
+    assert async_logger.errors == sync_logger.errors
+    assert async_logger.warnings == sync_logger.warnings
+
+
+def test_sync_sources_are_accepted(memory_rule_source, memory_config_source):
+    expected = RuleProcessor(memory_rule_source, memory_config_source, SafeConditionEvaluator()).process_rules(_data())
+    processor = AsyncRuleProcessor(memory_rule_source, memory_config_source, SafeConditionEvaluator())
+    assert asyncio.run(processor.process_rules(_data())) == expected
+
+
+def test_rules_and_config_are_fetched_concurrently(sample_rules_data):
+    processor = AsyncRuleProcessor(
+        RemoteRules(sample_rules_data, delay=0.2), RemoteConfig({}, delay=0.2), SafeConditionEvaluator(),
+    )
+    start = time.perf_counter()
+    asyncio.run(processor.process_rules([]))
+    assert time.perf_counter() - start < 0.35
+
+
+def test_event_loop_stays_responsive(sample_rules_data):
+    processor = AsyncRuleProcessor(RemoteRules(sample_rules_data), RemoteConfig({}), SafeConditionEvaluator(), batch_size=20000)
+    data = [{"value": 1, "name": "x"}] * 60000
+
+    async def main() -> tuple[list[Any], int]:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        passed = await processor.process_rules(data)
+        task.cancel()
+        return passed, ticks
+
+    passed, ticks = asyncio.run(main())
+    assert passed == []
+    assert ticks > 0
+
+
+class WrappedRemoteRules(RemoteRules):
+    """Fuente asíncrona cuyo `get_rules` no es `async def` pero retorna una corrutina."""
+    def get_rules(self):  # type: ignore[override]
+        return super().get_rules()
+
+
+def test_awaitable_returning_source_is_awaited(sample_rules_data, sample_config_data, memory_rule_source, memory_config_source):
+    expected = RuleProcessor(memory_rule_source, memory_config_source, SafeConditionEvaluator()).process_rules(_data())
+    processor = AsyncRuleProcessor(WrappedRemoteRules(sample_rules_data), RemoteConfig(sample_config_data), SafeConditionEvaluator())
+    assert asyncio.run(processor.process_rules(_data())) == expected
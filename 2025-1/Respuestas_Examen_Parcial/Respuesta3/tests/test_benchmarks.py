@@ -0,0 +1,30 @@
+"""Benchmarks de pytest-benchmark sobre los modos de bench_validator (`pytest --benchmark-only`)."""
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from bench_validator import MODES, OPERATORS, _Unavailable, build_scenario, compare_with_baseline
+
+
+# Sin has_key las filas comparten claves y el modo columnar también se puede medir
+SCENARIO = build_scenario(items=5000, rules=50, skew=1.0, pass_rate=0.3, operators=OPERATORS[:-1])
+EXPECTED = MODES["compilado"](SCENARIO, 1)
+
+
+@pytest.mark.parametrize("mode", list(MODES))
+def test_mode_throughput(benchmark, mode: str):
+    benchmark.group = "validator"
+    try:
+        MODES[mode](SCENARIO, 2)
+    except _Unavailable as reason:
+        pytest.skip(str(reason))
+    passed = benchmark.pedantic(MODES[mode], args=(SCENARIO, 2), rounds=3, iterations=1)
+    assert passed == EXPECTED
+
+
+def test_baseline_comparison_flags_only_drops_beyond_threshold():
+    baseline = {"items_per_sec": {"compilado": 1000.0, "indexado": 1000.0, "legacy": 1000.0}}
+    regressions = compare_with_baseline({"compilado": 850.0, "indexado": 700.0}, baseline, threshold=0.2)
+    assert len(regressions) == 1 and "indexado" in regressions[0]
@@ -0,0 +1,126 @@
+"""Pruebas de los decoradores de caché para las fuentes de reglas y configuración."""
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+from typing import Any, Hashable, Iterable
+
+from validator_module_refactored import (
+    CachingConfigSource,
+    CachingRuleSource,
+    RuleProcessor,
+    SafeConditionEvaluator,
+)
+from conftest import ListCapturingLogger, MemoryConfigSource
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RemoteRuleSource:
+    """Fuente versionada que cuenta cuántas veces se descargan las reglas."""
+    def __init__(self, conditions: list[str]):
+        self.conditions = conditions
+        self.version = 1
+        self.downloads = 0
+        self.fail = False
+
+    def get_version(self) -> Hashable:
+        if self.fail:
+            raise ConnectionError("fuente caída")
+        return self.version
+
+    def get_rules(self) -> Iterable[Any]:
+        self.downloads += 1
+        return [SimpleNamespace(id=f"R{i}", condition=c, description=None) for i, c in enumerate(self.conditions)]
+
+
+class CountingEvaluator(SafeConditionEvaluator):
+    def __init__(self):
+        super().__init__()
+        self.compiles = 0
+
+    def compile(self, condition_str: str):
+        self.compiles += 1
+        return super().compile(condition_str)
+
+
+def test_rules_are_served_from_cache_until_ttl():
+    clock, remote = FakeClock(), RemoteRuleSource(["value > 10"])
+    cached = CachingRuleSource(remote, ttl=30, background=False, clock=clock)
+    assert remote.downloads == 1
+
+    for _ in range(5):
+        cached.get_rules()
+    clock.now = 31
+    cached.get_rules()
+    assert remote.downloads == 1 # La versión no cambió: no se descargan las reglas
+
+    remote.version = 2
+    clock.now = 62
+    cached.get_rules()
+    assert remote.downloads == 2
+    assert cached.get_version() == 0 # Nueva versión, mismo contenido
+
+
+def test_processor_recompiles_only_when_rules_change():
+    clock, remote = FakeClock(), RemoteRuleSource(["value > 10"])
+    evaluator = CountingEvaluator()
+    processor = RuleProcessor(
+        CachingRuleSource(remote, ttl=1, background=False, clock=clock), MemoryConfigSource({}), evaluator,
+    )
+    data = [{"value": 5}, {"value": 15}]
+
+    assert processor.process_rules(data) == [{"value": 15}]
+    assert processor.process_rules(data) == [{"value": 15}]
+    assert evaluator.compiles == 1
+
+    remote.conditions = ["value < 10"]
+    remote.version = 2
+    clock.now = 5
+    assert processor.process_rules(data) == [{"value": 5}] # Sin `background` el refresco es inmediato
+    assert processor.process_rules(data) == [{"value": 5}]
+    assert evaluator.compiles == 2
+
+
+def test_source_errors_keep_serving_stale_rules():
+    clock, remote, logger = FakeClock(), RemoteRuleSource(["value > 10"]), ListCapturingLogger()
+    cached = CachingRuleSource(remote, ttl=1, background=False, logger=logger, clock=clock)
+    remote.fail = True
+    clock.now = 2
+
+    assert [rule.condition for rule in cached.get_rules()] == ["value > 10"]
+    assert len(logger.errors) == 1
+
+
+def test_background_refresh_never_blocks_callers():
+    release, fetched = threading.Event(), threading.Event()
+
+    class SlowConfig:
+        def __init__(self):
+            self.config = {"version": "1"}
+
+        def get_config(self) -> dict[str, Any]:
+            if self.config["version"] != "1":
+                release.wait(5)
+                fetched.set()
+            return dict(self.config)
+
+    clock, slow = FakeClock(), SlowConfig()
+    cached = CachingConfigSource(slow, ttl=1, clock=clock)
+    slow.config = {"version": "2"}
+    clock.now = 2
+
+    assert cached.get_config() == {"version": "1"} # El refresco va en otro hilo
+    release.set()
+    assert fetched.wait(5)
+    for _ in range(100):
+        if cached.get_version() == 1:
+            break
+        threading.Event().wait(0.01)
+    assert cached.get_config() == {"version": "2"}
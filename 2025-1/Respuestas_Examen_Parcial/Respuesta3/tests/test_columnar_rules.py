@@ -0,0 +1,134 @@
+"""Pruebas del modo columnar de RuleProcessor (requiere NumPy; pandas es opcional)."""
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from validator_module_refactored import RuleProcessor, SafeConditionEvaluator
+from conftest import ListCapturingLogger, MemoryConfigSource, MemoryRuleSource
+
+
+CONDITIONS = [
+    "value > 50",
+    "value < 5",
+    "value > abc",
+    "score == 3",
+    "score < 99999999999999999999",
+    "flag == 1",
+    "name == 'user7'",
+    "name contains 9",
+    "mixed > 10",
+    "mixed == texto",
+    "mixed contains ex",
+    "small > -1000",
+    "has_key extra",
+    "has_key name",
+    "missing == 1",
+    "value",
+    "value ~ 3",
+]
+
+
+def _values(length: int, seed: int = 0) -> dict[str, list[Any]]:
+    """Columnas como listas de Python: de ellas salen las filas de referencia."""
+    rng = random.Random(seed)
+    return {
+        "id": list(range(length)),
+        "value": [rng.randrange(100) for _ in range(length)],
+        "score": [rng.choice([3.0, 1.5, float("nan")]) for _ in range(length)],
+        "flag": [rng.random() < 0.5 for _ in range(length)],
+        "name": [f"user{rng.randrange(20)}" for _ in range(length)],
+        "mixed": [rng.choice([7, 12, "texto", None]) for _ in range(length)],
+        "small": [rng.randrange(256) for _ in range(length)],
+    }
+
+
+def _columns(length: int, seed: int = 0) -> dict[str, Any]:
+    values = _values(length, seed)
+    columns = {name: np.array(column) for name, column in values.items()}
+    columns["mixed"] = np.array(values["mixed"], dtype=object)
+    columns["small"] = np.array(values["small"], dtype=np.uint8)
+    return columns
+
+
+def _rows(values: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    return [dict(zip(values, row)) for row in zip(*values.values())]
+
+
+def _processor(conditions: list[str], evaluator: Any = None) -> RuleProcessor:
+    rules = MemoryRuleSource([{"id": f"R{i}", "condition": c} for i, c in enumerate(conditions)])
+    return RuleProcessor(rules, MemoryConfigSource({"version": "test"}), evaluator or SafeConditionEvaluator())
+
+
+@pytest.mark.parametrize("condition", CONDITIONS)
+def test_each_operator_matches_row_by_row(condition: str):
+    """Cada operador del DSL da, fila a fila, el mismo resultado vectorizado que `process_rules`."""
+    values = _values(200)
+    processor = _processor([condition])
+
+    expected = [row["id"] for row in processor.process_rules(_rows(values))]
+    assert processor.process_columns(_columns(200))["id"].tolist() == expected
+    assert processor.process_columns(values)["id"].tolist() == expected
+
+
+@pytest.mark.parametrize("column, condition", [
+    ([1, "a", 2, "1", "b1"], "x == 1"),
+    ([1, "a", 2, "1", "b1"], "x contains 1"),
+    ([1, "a", 2, "1", "b1"], "x == a"),
+    ([True, 2, False, 0], "x > 0"),
+    ([True, 2, False, 0], "x == 1"),
+    ([10, 3.5, 7, 5.0], "x > 5"),
+    ([10, 3.5, 7, 5.0], "x == 5"),
+])
+def test_list_columns_keep_their_values(column: list[Any], condition: str):
+    """Una lista con tipos mixtos no se convierte: filtra y retorna lo mismo que `process_rules`."""
+    processor = _processor([condition])
+
+    expected = [row["x"] for row in processor.process_rules(_rows({"x": column}))]
+    result = processor.process_columns({"x": column})["x"].tolist()
+    assert result == expected
+    assert [type(value) for value in result] == [type(value) for value in expected]
+
+
+def test_rules_are_combined_with_or(list_capturing_logger: ListCapturingLogger):
+    batch = _columns(500, seed=1)
+    rows = _rows(_values(500, seed=1))
+    rules = MemoryRuleSource([{"id": f"R{i}", "condition": c} for i, c in enumerate(CONDITIONS[:3])])
+    processor = RuleProcessor(rules, MemoryConfigSource({}), SafeConditionEvaluator(), list_capturing_logger)
+
+    result = processor.process_columns(batch)
+    assert result["id"].tolist() == [row["id"] for row in processor.process_rules(rows)]
+    assert set(result) == set(batch)
+    assert any("lote columnar" in message for message in list_capturing_logger.errors)
+
+
+class _RowOnlyEvaluator:
+    """Evaluador sin soporte columnar: el procesador debe reconstruir las filas."""
+    def evaluate(self, condition_str: str, item: dict[str, Any]) -> bool:
+        return SafeConditionEvaluator().evaluate(condition_str, item)
+
+
+def test_evaluator_without_columnar_support():
+    batch = _columns(100, seed=2)
+    expected = _processor(CONDITIONS).process_columns(batch)["id"].tolist()
+    assert _processor(CONDITIONS, _RowOnlyEvaluator()).process_columns(batch)["id"].tolist() == expected
+
+
+def test_columns_must_have_the_same_length():
+    with pytest.raises(ValueError):
+        _processor(CONDITIONS).process_columns({"value": np.arange(3), "name": np.array(["a"])})
+
+
+def test_dataframe_matches_records():
+    pd = pytest.importorskip("pandas")
+    frame = pd.DataFrame(_columns(300, seed=3))
+    processor = _processor(CONDITIONS)
+
+    expected = [row["id"] for row in processor.process_rules(frame.to_dict("records"))]
+    result = processor.process_columns(frame)
+    assert isinstance(result, pd.DataFrame)
+    assert result["id"].tolist() == expected
@@ -0,0 +1,76 @@
+"""Pruebas de la compilación de condiciones del SafeConditionEvaluator."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from validator_module_refactored import ConditionCompiler, RuleProcessor, SafeConditionEvaluator
+from conftest import ListCapturingLogger, MemoryConfigSource, MemoryRuleSource
+
+
+CONDITIONS = [
+    "value > 10",
+    "value < 3",
+    "value > abc",
+    "value == 7",
+    "name == 'ok'",
+    "name == ok",
+    "status contains 'active'",
+    "status CONTAINS act",
+    "has_key extra",
+    "name HAS_KEY",
+    "value",
+    "value >",
+    "value ~ 3",
+]
+
+ITEMS: list[dict[str, Any]] = [
+    {"value": 15, "name": "ok"},
+    {"value": 7, "name": "foo", "status": "is_active"},
+    {"value": "texto", "name": 3, "extra": None},
+    {"value": 2, "status": ["active"]},
+    {},
+]
+
+
+@pytest.mark.parametrize("condition", CONDITIONS)
+def test_compiled_predicate_matches_evaluate(condition: str):
+    """El predicado compilado retorna lo mismo y registra los mismos errores que `evaluate`."""
+    interpreted_logger, compiled_logger = ListCapturingLogger(), ListCapturingLogger()
+    interpreted = SafeConditionEvaluator(logger=interpreted_logger)
+    predicate = SafeConditionEvaluator(logger=compiled_logger).compile(condition)
+
+    for item in ITEMS:
+        assert predicate(item) == interpreted.evaluate(condition, item)
+    assert compiled_logger.errors == interpreted_logger.errors
+
+
+def test_compile_is_cached(safe_evaluator: SafeConditionEvaluator, list_capturing_logger: ListCapturingLogger):
+    """Cada condición se interpreta una sola vez; las advertencias de formato no se repiten."""
+    assert isinstance(safe_evaluator, ConditionCompiler)
+    assert safe_evaluator.compile("value > 10") is safe_evaluator.compile("value > 10")
+
+    safe_evaluator.compile("value")
+    safe_evaluator.compile("value")
+    assert len(list_capturing_logger.warnings) == 1
+
+
+class _InterpretingEvaluator:
+    """Evaluador que solo expone `evaluate`, para el camino sin compilación."""
+    def __init__(self):
+        self._inner = SafeConditionEvaluator()
+
+    def evaluate(self, condition_str: str, item: dict[str, Any]) -> bool:
+        return self._inner.evaluate(condition_str, item)
+
+
+def test_processor_results_match_with_and_without_compilation(sample_config_data: dict[str, Any]):
+    """Compilar las reglas no cambia qué elementos pasan."""
+    rule_source = MemoryRuleSource([{"id": f"R{i}", "condition": c} for i, c in enumerate(CONDITIONS)])
+    config_source = MemoryConfigSource(sample_config_data)
+    data = ITEMS * 3
+
+    compiled = RuleProcessor(rule_source, config_source, SafeConditionEvaluator())
+    interpreted = RuleProcessor(rule_source, config_source, _InterpretingEvaluator())
+    assert compiled.process_rules(data) == interpreted.process_rules(data)
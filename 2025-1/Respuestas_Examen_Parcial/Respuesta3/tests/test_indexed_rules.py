@@ -0,0 +1,84 @@
+"""Pruebas del modo indexado (RuleIndex) de RuleProcessor."""
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import pytest
+
+from validator_module_refactored import RuleIndex, RuleProcessor, SafeConditionEvaluator
+from conftest import ListCapturingLogger, MemoryConfigSource, MemoryRuleSource
+
+
+def _random_rules(rng: random.Random, count: int) -> list[dict[str, Any]]:
+    templates = [
+        "value == {n}", "value > {n}", "value < {n}", "code == {n}", "code > {n}",
+        "name == 'user{n}'", "name == {n}", "status contains {n}", "has_key extra{n}",
+        "value > abc", "value", "value ~ {n}",
+    ]
+    return [
+        {"id": f"R{i}", "condition": rng.choice(templates).format(n=rng.randrange(-5, 60))}
+        for i in range(count)
+    ]
+
+
+def _random_item(rng: random.Random) -> dict[str, Any]:
+    values = [rng.randrange(-10, 70), rng.random() * 60, True, float("nan"), "12", None, [1], 7.0]
+    item = {
+        "value": rng.choice(values),
+        "code": rng.choice(values),
+        "name": rng.choice([f"user{rng.randrange(60)}", rng.randrange(60), "x"]),
+        "status": rng.choice(["s12", "s3", 12]),
+    }
+    if rng.random() < 0.3:
+        item[f"extra{rng.randrange(60)}"] = 1
+    if rng.random() < 0.2:
+        del item["value"]
+    return item
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_index_finds_the_same_first_rule(seed: int):
+    """El índice reporta exactamente la misma regla que la evaluación secuencial."""
+    rng = random.Random(seed)
+    rules = MemoryRuleSource(_random_rules(rng, 80))
+    config = MemoryConfigSource({"enable_detailed_logging_refactored": True})
+    data = [_random_item(rng) for _ in range(400)]
+
+    serial_logger, indexed_logger = ListCapturingLogger(), ListCapturingLogger()
+    serial = RuleProcessor(rules, config, SafeConditionEvaluator(), serial_logger).process_rules(data)
+    indexed = RuleProcessor(rules, config, SafeConditionEvaluator(), indexed_logger, indexed=True).process_rules(data)
+
+    assert indexed == serial
+    assert indexed_logger.infos[1:] == serial_logger.infos[1:]
+
+
+def test_index_resolves_equality_and_ranges_without_evaluating():
+    rules = MemoryRuleSource(
+        [{"id": f"EQ{i}", "condition": f"code == {i}"} for i in range(1000)]
+        + [{"id": f"GT{i}", "condition": f"value > {i}"} for i in range(1000)]
+    )
+    evaluator = SafeConditionEvaluator()
+    compiled = [(rule, evaluator.compile(rule.condition)) for rule in rules.get_rules()]
+    index = RuleIndex(compiled, evaluator)
+
+    assert index.first_match({"code": 500}).id == "EQ500"
+    assert index.first_match({"value": 10}).id == "GT0"
+    assert index.first_match({"value": 0, "code": -1}) is None
+    assert index._others == []
+
+
+class _PlainEvaluator:
+    def evaluate(self, condition_str: str, item: dict[str, Any]) -> bool:
+        return SafeConditionEvaluator().evaluate(condition_str, item)
+
+
+def test_other_evaluators_are_not_indexed(memory_rule_source, memory_config_source):
+    data = [{"value": 11}, {"value": 1}, {"name": "ok"}]
+    processor = RuleProcessor(memory_rule_source, memory_config_source, _PlainEvaluator(), indexed=True)
+    assert processor.process_rules(data) == [{"value": 11}, {"name": "ok"}]
+
+
+def test_adaptive_and_indexed_are_exclusive(memory_rule_source, memory_config_source):
+    with pytest.raises(ValueError):
+        RuleProcessor(memory_rule_source, memory_config_source, SafeConditionEvaluator(), adaptive=True, indexed=True)
@@ -0,0 +1,61 @@
+"""Pruebas del compilador de condiciones que reemplaza a eval() en el RuleProcessor legacy."""
+from __future__ import annotations
+
+import pytest
+
+from validator_module_legacy import RuleProcessor as LegacyRuleProcessor
+from validator_module_legacy import SafeExpressionCompiler, UnsafeConditionError
+
+
+@pytest.fixture
+def legacy_processor(tmp_path, monkeypatch) -> LegacyRuleProcessor:
+    monkeypatch.chdir(tmp_path) # Sin rules.conf: se usan las reglas de fallback
+    return LegacyRuleProcessor()
+
+
+@pytest.mark.parametrize("condition, item, expected", [
+    ("item['value'] > 10 and item['name'].startswith('A')", {"value": 11, "name": "Ana"}, True),
+    ("item['value'] > 10 and item['name'].startswith('A')", {"value": 11, "name": "Bea"}, False),
+    ("item.get('status') == 'active' or not item.get('tags')", {"tags": []}, True),
+    ("item['value'] % 2 == 0 and item['value'] in (2, 4, 6)", {"value": 4}, True),
+    ("item['name'][:2].lower() == 'ab'", {"name": "ABC"}, True),
+    ("item.get('x') is None", {}, True),
+])
+def test_compiled_condition_matches_eval(condition: str, item: dict, expected: bool):
+    function = SafeExpressionCompiler().compile(condition)
+    assert bool(function(item)) is expected
+    assert bool(eval(condition, {"__builtins__": {}}, {"item": item})) is expected # noqa: S307
+
+
+@pytest.mark.parametrize("condition", [
+    "__import__('os').system('true')",
+    "item.__class__",
+    "().__class__.__bases__[0].__subclasses__()",
+    "[x for x in item]",
+    "(lambda: 1)()",
+    "item.pop('value')",
+    "item.get('a', default=1)",
+    "open('rules.conf')",
+    "item['value'] >",
+])
+def test_unsafe_or_invalid_conditions_are_rejected(condition: str):
+    with pytest.raises(UnsafeConditionError):
+        SafeExpressionCompiler().compile(condition)
+
+
+def test_processor_caches_per_rule_id(legacy_processor: LegacyRuleProcessor):
+    data = [{"value": 15, "name": "x"}, {"value": 1, "name": "test"}, {"value": 1, "name": "y"}]
+    assert legacy_processor.process_rules(data) == data[:2]
+
+    compiled = dict(legacy_processor._compiled_conditions)
+    legacy_processor.process_rules(data)
+    assert legacy_processor._compiled_conditions == compiled # Nada se recompila
+
+    legacy_processor._rules[0]["condition"] = "item['value'] > 100"
+    assert legacy_processor.process_rules(data) == data[1:2]
+
+
+def test_rejected_rule_never_passes(legacy_processor: LegacyRuleProcessor):
+    legacy_processor._rules = [{"id": "MAL", "condition": "item.__class__"}, {"id": "OK", "condition": "item['value'] > 10"}]
+    assert legacy_processor.process_rules([{"value": 11}, {"value": 1}]) == [{"value": 11}]
+    assert legacy_processor._evaluate_condition("item.__class__", {"value": 11}, "MAL") is False
@@ -0,0 +1,55 @@
+"""Pruebas del RuleProcessor en paralelo con un pool de procesos."""
+from __future__ import annotations
+
+import pickle
+from typing import Any
+
+import pytest
+
+from validator_module_refactored import ParallelRuleProcessor, RuleProcessor, SafeConditionEvaluator
+from conftest import ListCapturingLogger, MemoryConfigSource, MemoryRuleSource
+
+
+def _data(count: int) -> list[Any]:
+    items: list[Any] = [{"value": i % 25, "name": "ok" if i % 7 == 0 else "x", "seq": i} for i in range(count)]
+    items[3] = "no es dict"
+    return items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_parallel_matches_serial_in_order(memory_rule_source, memory_config_source, chunk_size: int):
+    data = _data(300)
+    serial = RuleProcessor(memory_rule_source, memory_config_source, SafeConditionEvaluator())
+    parallel = ParallelRuleProcessor(
+        memory_rule_source, memory_config_source, SafeConditionEvaluator(), workers=2, chunk_size=chunk_size,
+    )
+    assert parallel.process_rules(data) == serial.process_rules(data)
+
+
+def test_parallel_logs_like_serial(memory_rule_source, sample_config_data: dict[str, Any]):
+    """Los mensajes por elemento (fallos, reglas cumplidas, saltados) se emiten en el proceso principal."""
+    serial_logger, parallel_logger = ListCapturingLogger(), ListCapturingLogger()
+    config = MemoryConfigSource(sample_config_data)
+    data = _data(40)
+
+    RuleProcessor(memory_rule_source, config, SafeConditionEvaluator(), serial_logger).process_rules(data)
+    ParallelRuleProcessor(
+        memory_rule_source, config, SafeConditionEvaluator(), parallel_logger, workers=2, chunk_size=8,
+    ).process_rules(data)
+
+    assert parallel_logger.errors == serial_logger.errors
+    assert parallel_logger.warnings == serial_logger.warnings
+    assert parallel_logger.infos[2:-1] == serial_logger.infos[2:-1] # Sin los mensajes de inicio y resumen
+
+
+def test_evaluator_pickles_without_compiled_closures():
+    evaluator = SafeConditionEvaluator()
+    evaluator.compile("value > 10")
+    clone = pickle.loads(pickle.dumps(evaluator))
+    assert clone.parse("value > 10") == evaluator.parse("value > 10")
+    assert clone.compile("value > 10")({"value": 11})
+
+
+def test_custom_rule_source_with_empty_rules():
+    processor = ParallelRuleProcessor(MemoryRuleSource([]), MemoryConfigSource({}), SafeConditionEvaluator(), workers=2)
+    assert processor.process_rules(_data(10)) == []
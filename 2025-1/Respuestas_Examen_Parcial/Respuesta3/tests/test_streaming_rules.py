@@ -0,0 +1,41 @@
+"""Pruebas del modo en streaming de RuleProcessor."""
+from __future__ import annotations
+
+import itertools
+from typing import Any
+
+from validator_module_refactored import RuleProcessor
+from conftest import ListCapturingLogger
+
+
+def test_stream_yields_lazily_from_endless_iterable(refactored_processor: RuleProcessor):
+    """Un iterable infinito se puede validar consumiendo solo lo necesario."""
+    endless = ({"value": i % 20} for i in itertools.count())
+    passed = list(itertools.islice(refactored_processor.iter_process_rules(endless), 5))
+    assert passed == [{"value": v} for v in range(11, 16)]
+
+
+def test_stream_matches_process_rules_and_feeds_sink(refactored_processor: RuleProcessor):
+    data: list[Any] = [{"value": 15}, {"value": 1}, "no es dict", {"name": "ok"}, {"status": "inactive"}]
+    failures: list[dict] = []
+
+    streamed = list(refactored_processor.iter_process_rules(data, failure_sink=failures.append))
+    assert streamed == refactored_processor.process_rules(data)
+    assert failures == [{"value": 1}]
+
+
+def test_stream_logs_aggregated_counts(refactored_processor: RuleProcessor, list_capturing_logger: ListCapturingLogger):
+    """Los fallos se registran como un conteo por intervalo, no una línea por elemento."""
+    data = [{"value": 0}] * 1000 + [None, 3]
+    list(refactored_processor.iter_process_rules(data, log_interval=3600))
+
+    assert len(list_capturing_logger.errors) == 1
+    assert "1000 elementos" in list_capturing_logger.errors[0]
+    assert len(list_capturing_logger.warnings) == 1
+    assert "2 elementos" in list_capturing_logger.warnings[0]
+    assert "1000 fallidos, 2 saltados" in list_capturing_logger.infos[-1]
+
+
+def test_stream_flushes_each_interval(refactored_processor: RuleProcessor, list_capturing_logger: ListCapturingLogger):
+    list(refactored_processor.iter_process_rules([{"value": 0}] * 3, log_interval=0))
+    assert len(list_capturing_logger.errors) == 3
@@ -2,10 +2,83 @@
 Implementación legacy que viola intencionalmente varios principios SOLID
 y es difícil de probar unitariamente en aislamiento.
 """
+import ast
 import logging
 import json
 from pathlib import Path
 import time # Para simular latencia en configuración externa
+from typing import Any, Callable
+
+
+class UnsafeConditionError(ValueError):
+    """La condición no es una expresión válida o usa construcciones fuera de la lista blanca."""
+
+
+class SafeExpressionCompiler:
+    """
+    Compila condiciones legacy (`item['value'] > 10 and item.get('status') == 'active'`) sin `eval()`
+    sobre la cadena. La condición se analiza con `ast` y solo se aceptan nodos de una lista blanca:
+    literales, `item`, subíndices, comparaciones, operadores lógicos y aritméticos, y llamadas a unos
+    pocos métodos de consulta (`get`, `startswith`, ...). Los atributos sueltos, los nombres distintos
+    de `item`, las lambdas y las comprensiones se rechazan, lo que cierra los escapes típicos vía
+    `__class__`/`__subclasses__`. El resultado es una función de Python ya compilada.
+    """
+
+    ALLOWED_NODES = (
+        ast.Expression, ast.Load,
+        ast.BoolOp, ast.And, ast.Or,
+        ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+        ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+        ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+        ast.IfExp, ast.Name, ast.Constant, ast.Subscript, ast.Slice,
+        ast.Tuple, ast.List, ast.Set, ast.Call, ast.Attribute,
+    )
+    ALLOWED_METHODS = frozenset({
+        "get", "keys", "values", "items",
+        "startswith", "endswith", "lower", "upper", "strip", "lstrip", "rstrip",
+        "isdigit", "isalpha", "isalnum", "count", "find", "split",
+    })
+
+    def compile(self, condition_str: str) -> Callable[[dict], Any]:
+        """
+        Valida `condition_str` y la compila a una función `f(item)`.
+
+        Throws:
+            UnsafeConditionError: Si la sintaxis es inválida o usa construcciones no permitidas.
+        """
+        try:
+            tree = ast.parse(condition_str.strip(), mode="eval")
+        except SyntaxError as exc:
+            raise UnsafeConditionError(f"Sintaxis inválida en '{condition_str}': {exc.msg}") from exc
+        self._check(tree, condition_str)
+
+        function_tree = ast.Expression(body=ast.Lambda(
+            args=ast.arguments(posonlyargs=[], args=[ast.arg(arg="item")], kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=tree.body,
+        ))
+        ast.fix_missing_locations(function_tree)
+        # Solo se ejecuta el árbol ya validado, y sin builtins disponibles
+        return eval(compile(function_tree, "<condición>", "eval"), {"__builtins__": {}})  # noqa: S307
+
+    def _check(self, tree: ast.AST, condition_str: str) -> None:
+        call_targets = set()
+        for node in ast.walk(tree): # En anchura: cada Call se visita antes que su atributo
+            if not isinstance(node, self.ALLOWED_NODES):
+                raise UnsafeConditionError(f"Construcción no permitida ({type(node).__name__}) en '{condition_str}'")
+            if isinstance(node, ast.Name) and node.id != "item":
+                raise UnsafeConditionError(f"Nombre no permitido '{node.id}' en '{condition_str}'")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Attribute) or node.keywords:
+                    raise UnsafeConditionError(f"Solo se permiten llamadas a métodos sin keywords en '{condition_str}'")
+                call_targets.add(id(node.func))
+            if isinstance(node, ast.Attribute):
+                if id(node) not in call_targets or node.attr not in self.ALLOWED_METHODS:
+                    raise UnsafeConditionError(f"Atributo no permitido '{node.attr}' en '{condition_str}'")
+
+
+def _never(item: dict) -> bool:
+    """Condición de una regla rechazada por el compilador: nunca se cumple."""
+    return False
 
 class RuleProcessor:
     """Procesa elementos de datos contra una lista de reglas codificada internamente o basada en archivos."""
@@ -26,6 +99,10 @@ class RuleProcessor:
         self._config = self._get_external_config()
         self._rules = self._load_rules()
 
+        # Condiciones compiladas por id de regla: (condición, función)
+        self._compiler = SafeExpressionCompiler()
+        self._compiled_conditions: dict[str, tuple[str, Callable[[dict], Any]]] = {}
+
 
     # Métodos privados auxiliares que atan la clase a implementaciones concretas
     # ---------------------------------------------------------------------
@@ -64,16 +141,32 @@ class RuleProcessor:
             self._logger.error(f"No se pudo obtener la configuración externa: {exc}. Usando config por defecto.")
             return {"threshold": 0, "enable_detailed_logging": False, "version": "default-legacy"}
 
-    def _evaluate_condition(self, condition_str: str, item: dict) -> bool:
+    def _compiled_condition(self, condition_str: str, rule_id: str | None = None) -> Callable[[dict], Any]:
+        """
+        Función compilada de la condición, cacheada por id de regla (o por la cadena si no hay id).
+        Si la condición de una regla cambia, se vuelve a compilar.
+        """
+        key = rule_id if rule_id is not None else condition_str
+        cached = self._compiled_conditions.get(key)
+        if cached is not None and cached[0] == condition_str:
+            return cached[1]
+        try:
+            function = self._compiler.compile(condition_str)
+        except UnsafeConditionError as exc:
+            self._logger.error(f"Regla {rule_id or 'Desconocida'} rechazada: {exc}. Nunca se cumplirá.")
+            function = _never
+        self._compiled_conditions[key] = (condition_str, function)
+        return function
+
+    def _evaluate_condition(self, condition_str: str, item: dict, rule_id: str | None = None) -> bool:
         """
-        **ZONA DE PELIGRO LEGACY** – usa `eval()` directamente sobre cadenas entrantes.
-        Esto es extremadamente inseguro y propenso a errores.
+        Evalúa la condición con su versión compilada por `SafeExpressionCompiler`.
+        Ya no se llama a `eval()` sobre la cadena en cada elemento.
+        Ej: condition_str = "item['value'] > 10 and item['name'].startswith('A')"
         """
+        function = self._compiled_condition(condition_str, rule_id)
         try:
-            # ADVERTENCIA: 100% inseguro – esta es *exactamente* la forma de NO hacerlo.
-            # Se pasa `item` al contexto de eval para que las condiciones puedan acceder a sus claves.
-            # Ej: condition_str = "item['value'] > 10 and item['name'].startswith('A')"
-            return bool(eval(condition_str, {"__builtins__": {}}, {"item": item})) # noqa: S307
+            return bool(function(item))
         except Exception as exc:
             self._logger.error(f"Error evaluando condición '{condition_str}' en {item}: {exc}")
             return False
@@ -104,7 +197,7 @@ class RuleProcessor:
                     self._logger.warning(f"Regla {rule.get('id', 'Desconocida')} no tiene condición, saltando.")
                     continue
 
-                if self._evaluate_condition(condition, element):
+                if self._evaluate_condition(condition, element, rule.get("id")):
                     passed_at_least_one_rule = True
                     if self._config.get("enable_detailed_logging"):
                         self._logger.info(f"Elemento {element} PASÓ la regla {rule.get('id')}: {rule.get('description')}")
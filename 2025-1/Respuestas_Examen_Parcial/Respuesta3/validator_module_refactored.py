@@ -3,8 +3,20 @@ Implementación refactorizada aplicando principios SOLID y Dependency Injection
 """
 from __future__ import annotations
 
+import asyncio
+import inspect
 import logging
-from typing import Any, Callable, Iterable, Protocol, runtime_checkable
+import operator as operator_module
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import partial
+from itertools import accumulate
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Hashable, Iterable, Iterator, NamedTuple, Protocol, Sequence, runtime_checkable
 
 # Definición de protocolos para las dependencias (Abstracciones)
 # ---------------------------------------------------------------------------
@@ -37,6 +49,54 @@ class ConditionEvaluator(Protocol):
     def evaluate(self, condition_str: str, item: dict[str, Any]) -> bool:
         ...
 
+@runtime_checkable
+class AsyncRuleSource(Protocol):
+    """Variante asíncrona de `RuleSource`, para fuentes remotas en pipelines de asyncio."""
+    async def get_rules(self) -> Iterable[Rule]:
+        ...
+
+@runtime_checkable
+class AsyncConfigSource(Protocol):
+    """Variante asíncrona de `ConfigSource`."""
+    async def get_config(self) -> dict[str, Any]:
+        ...
+
+@runtime_checkable
+class VersionedSource(Protocol):
+    """
+    Fuente (de reglas o de configuración) que expone una versión barata de consultar,
+    como un ETag o un contador: si no cambia, el contenido tampoco.
+    """
+    def get_version(self) -> Hashable:
+        ...
+
+# Predicado ya compilado: recibe un item y retorna True/False sin volver a interpretar la condición.
+Predicate = Callable[[dict[str, Any]], bool]
+
+class ParsedCondition(NamedTuple):
+    """Condición del DSL ya interpretada. `operand` es un int cuando el literal es entero."""
+    field: str
+    operator: str # ">", "<", "==", "contains" o "has_key"
+    operand: int | str | None
+
+@runtime_checkable
+class ConditionCompiler(Protocol):
+    """
+    Abstracción opcional para evaluadores que pueden compilar una condición una sola vez.
+    `RuleProcessor` la usa si el evaluador la implementa; si no, recurre a `evaluate`.
+    """
+    def compile(self, condition_str: str) -> Predicate:
+        ...
+
+@runtime_checkable
+class ColumnarConditionEvaluator(Protocol):
+    """
+    Abstracción opcional para evaluadores que resuelven una condición sobre un lote columnar
+    completo, retornando una máscara booleana de NumPy con una posición por fila.
+    """
+    def evaluate_columns(self, condition_str: str, batch: Any, length: int) -> Any:
+        ...
+
 @runtime_checkable
 class Logger(Protocol):
     """Abstracción para un logger, compatible con logging.Logger."""
@@ -62,6 +122,138 @@ class SafeConditionEvaluator:
     """
     def __init__(self, logger: Logger | None = None):
         self._logger = logger or _NullLogger()
+        self._compiled: dict[str, Predicate] = {} # Caché de predicados por condición
+        self._parsed: dict[str, ParsedCondition | None] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Los predicados son closures y no se pueden serializar; las condiciones interpretadas sí,
+        # así que al reconstruirlos en otro proceso no hace falta volver a partir las cadenas
+        state = self.__dict__.copy()
+        state["_compiled"] = {}
+        return state
+
+    def compile(self, condition_str: str) -> Predicate:
+        """
+        Interpreta `condition_str` una sola vez y retorna un predicado equivalente a `evaluate`.
+        El predicado se guarda en caché, así que compilar de nuevo la misma condición es gratis.
+        """
+        predicate = self._compiled.get(condition_str)
+        if predicate is None:
+            predicate = self._compiled[condition_str] = self._build_predicate(condition_str)
+        return predicate
+
+    def parse(self, condition_str: str) -> ParsedCondition | None:
+        """
+        Interpreta la sintaxis de `condition_str`. Retorna None (y registra una advertencia)
+        si la condición está malformada o usa un operador desconocido.
+        """
+        if condition_str not in self._parsed:
+            self._parsed[condition_str] = self._parse(condition_str)
+        return self._parsed[condition_str]
+
+    def _parse(self, condition_str: str) -> ParsedCondition | None:
+        parts = condition_str.split(maxsplit=2)
+        if len(parts) < 2:
+            self._logger.warning(f"Condición malformada (pocas partes): '{condition_str}'")
+            return None
+
+        field = parts[0]
+        operator = parts[1].lower()
+        if operator == "has_key":
+            return ParsedCondition(field, operator, None)
+        if len(parts) < 3:
+            self._logger.warning(f"Condición malformada para operador '{operator}': '{condition_str}'")
+            return None
+        value_to_compare_str = parts[2]
+
+        if operator in (">", "<", "=="):
+            try:
+                return ParsedCondition(field, operator, int(value_to_compare_str))
+            except ValueError:
+                # `==` compara entonces como cadena; `>`/`<` conservan el literal y fallan por item
+                if operator == "==":
+                    return ParsedCondition(field, operator, value_to_compare_str.strip("'\""))
+                return ParsedCondition(field, operator, value_to_compare_str)
+        if operator == "contains":
+            return ParsedCondition(field, operator, value_to_compare_str.strip("'\""))
+
+        self._logger.warning(f"Operador desconocido '{operator}' en condición: '{condition_str}'")
+        return None
+
+    def _build_predicate(self, condition_str: str) -> Predicate:
+        # Los errores de formato se reportan al compilar y la condición queda siempre falsa
+        parsed = self.parse(condition_str)
+        if parsed is None:
+            return _always_false
+        field, operator, operand = parsed
+        if operator == "has_key":
+            return lambda item: field in item
+        logger = self._logger
+
+        if operator in (">", "<"):
+            if isinstance(operand, str):
+                # Igual que `evaluate`: el error solo se reporta para items que tienen el campo
+                def type_error(item: dict[str, Any]) -> bool:
+                    if field in item:
+                        logger.error(f"Error de tipo al evaluar '{condition_str}' en {item}. ¿Comparación de tipos incorrecta?")
+                    return False
+                return type_error
+            compare: Callable[[Any, Any], bool] = operator_module.gt if operator == ">" else operator_module.lt
+        elif operator == "==":
+            if isinstance(operand, int):
+                compare = operator_module.eq
+            else:
+                compare = _equals_as_text
+        else: # contains
+            compare = _contains_text
+
+        def predicate(item: dict[str, Any]) -> bool:
+            if field not in item:
+                return False
+            try:
+                return compare(item[field], operand)
+            except Exception as e: # Mismo registro que `evaluate` para tipos incomparables
+                logger.error(f"Error inesperado al evaluar '{condition_str}' en {item}: {e}")
+                return False
+        return predicate
+
+    def evaluate_columns(self, condition_str: str, batch: Any, length: int) -> Any:
+        """
+        Evalúa la condición sobre un lote columnar (DataFrame o dict de columnas) y retorna
+        una máscara booleana de NumPy con `length` filas. Cada fila obtiene el mismo resultado
+        que `evaluate` sobre el dict de esa fila: las columnas numéricas o de texto con dtype propio
+        (arrays o Series) se comparan de forma vectorizada y las demás (listas, objetos, tipos mixtos)
+        se recorren con el predicado compilado.
+        """
+        np = _import_numpy()
+        parsed = self.parse(condition_str)
+        if parsed is None or parsed.field not in batch:
+            return np.zeros(length, dtype=bool)
+        field, operator, operand = parsed
+        if operator == "has_key":
+            return np.ones(length, dtype=bool)
+        if operator in (">", "<") and isinstance(operand, str):
+            self._logger.error(f"Error de tipo al evaluar '{condition_str}' en {length} filas. ¿Comparación de tipos incorrecta?")
+            return np.zeros(length, dtype=bool)
+
+        column = _as_column(batch[field])
+        kind = column.dtype.kind
+        try:
+            if kind in "biuf" and isinstance(operand, int):
+                if operator == ">":
+                    return column > operand
+                if operator == "<":
+                    return column < operand
+                return column == operand
+            if kind == "U" and isinstance(operand, str):
+                if operator == "==":
+                    return column == operand
+                return np.char.find(column, operand) >= 0
+        except (OverflowError, TypeError):
+            pass # p. ej. un literal fuera del rango del dtype: se resuelve elemento a elemento
+
+        predicate = self.compile(condition_str)
+        return np.fromiter((predicate({field: value}) for value in column), dtype=bool, count=length)
 
     def evaluate(self, condition_str: str, item: dict[str, Any]) -> bool:
         parts = condition_str.split(maxsplit=2)
@@ -113,6 +305,53 @@ class SafeConditionEvaluator:
             self._logger.error(f"Error inesperado al evaluar '{condition_str}' en {item}: {e}")
             return False
 
+def _import_numpy() -> Any:
+    """NumPy es una dependencia opcional: solo la necesita el modo columnar."""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("El modo columnar requiere NumPy: pip install numpy") from e
+    return numpy
+
+def _batch_length(batch: Any) -> int:
+    """Número de filas de un DataFrame o de un dict de columnas de igual longitud."""
+    if hasattr(batch, "columns"):
+        return len(batch.index)
+    lengths = {len(column) for column in batch.values()}
+    if len(lengths) > 1:
+        raise ValueError("Todas las columnas del lote deben tener la misma longitud.")
+    return lengths.pop() if lengths else 0
+
+def _as_column(values: Any) -> Any:
+    """
+    Columna como array de NumPy. Los arrays y las Series conservan su dtype; las demás secuencias
+    se copian con dtype=object, porque `np.asarray` convertiría [1, 'a'] en texto y [True, 2] en enteros.
+    """
+    np = _import_numpy()
+    if isinstance(values, np.ndarray):
+        return values
+    if hasattr(values, "to_numpy"):
+        return values.to_numpy()
+    return np.fromiter(values, dtype=object, count=len(values))
+
+def _batch_columns(batch: Any) -> dict[str, Any]:
+    """Columnas del lote como arrays de NumPy, indexadas por nombre."""
+    names = batch.columns if hasattr(batch, "columns") else batch.keys()
+    return {name: _as_column(batch[name]) for name in names}
+
+
+def _equals_as_text(item_value: Any, expected: Any) -> bool:
+    return str(item_value) == expected
+
+
+def _contains_text(item_value: Any, expected: Any) -> bool:
+    return isinstance(item_value, str) and expected in item_value
+
+
+def _always_false(item: dict[str, Any]) -> bool:
+    """Predicado de las condiciones que nunca pueden cumplirse (malformadas u operador desconocido)."""
+    return False
+
 # ---------------------------------------------------------------------------
 # Implementación de Null Object para Logger (Patrón Null Object)
 # ---------------------------------------------------------------------------
@@ -123,6 +362,205 @@ class _NullLogger:
     def error(self, msg: str, *args: Any, **kwargs: Any) -> None: pass
     def warning(self, msg: str, *args: Any, **kwargs: Any) -> None: pass
 
+# El modo adaptativo cronometra las evaluaciones de uno de cada tantos elementos
+_COST_SAMPLE_EVERY = 16
+
+class _RuleCounter:
+    """Contadores mutables de una regla en el modo adaptativo."""
+    __slots__ = ("evaluations", "hits", "timed", "nanoseconds")
+
+    def __init__(self) -> None:
+        self.evaluations = 0
+        self.hits = 0
+        self.timed = 0 # Evaluaciones cronometradas, que suman `nanoseconds`
+        self.nanoseconds = 0
+
+class RuleStats(NamedTuple):
+    """Estadísticas de una regla: veces evaluada, veces cumplida y costo medio estimado por muestreo."""
+    rule_id: str
+    evaluations: int
+    hits: int
+    mean_cost: float # Segundos por evaluación
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.evaluations if self.evaluations else 0.0
+
+class _FailureCounter:
+    """
+    Agrega los fallos y los elementos saltados de un stream para registrarlos como conteos
+    por intervalo, en lugar de una línea de log por elemento.
+    """
+    def __init__(self, logger: Logger, interval: float):
+        self._logger = logger
+        self._interval = interval
+        self._since = time.monotonic()
+        self.failed = self.skipped = 0 # Conteos del intervalo actual
+        self.total_failed = self.total_skipped = 0
+
+    def record_failure(self) -> None:
+        self.failed += 1
+        self.total_failed += 1
+        self._maybe_flush()
+
+    def record_skip(self, item_index: int, item: Any) -> None:
+        self.skipped += 1
+        self.total_skipped += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if time.monotonic() - self._since >= self._interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Registra los conteos pendientes y empieza un nuevo intervalo."""
+        now = time.monotonic()
+        elapsed = now - self._since
+        if self.failed:
+            self._logger.error(f"FALLO DE VALIDACIÓN REFACTORIZADO para {self.failed} elementos en los últimos {elapsed:.1f} s.")
+        if self.skipped:
+            self._logger.warning(f"{self.skipped} elementos no eran diccionarios y se saltaron en los últimos {elapsed:.1f} s.")
+        self.failed = self.skipped = 0
+        self._since = now
+
+# ---------------------------------------------------------------------------
+# Decoradores de caché para las fuentes (Patrón Decorator)
+# ---------------------------------------------------------------------------
+
+class _CachedFetch:
+    """
+    Valor obtenido de una fuente lenta, cacheado con TTL. Al vencer el TTL se refresca (en un hilo
+    aparte si `background`), consultando antes la versión de la fuente si la expone; mientras tanto
+    se sigue sirviendo el valor anterior. La generación solo aumenta si el contenido cambió.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Any],
+        fingerprint: Callable[[Any], Any],
+        source_version: Callable[[], Hashable] | None,
+        ttl: float,
+        background: bool,
+        logger: Logger,
+        clock: Callable[[], float],
+    ) -> None:
+        self._name = name
+        self._fetch = fetch
+        self._fingerprint = fingerprint
+        self._source_version = source_version
+        self._ttl = ttl
+        self._background = background
+        self._logger = logger
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # La carga inicial es la única que bloquea; ocurre al construir el decorador
+        self._tag = source_version() if source_version else None
+        value = fetch()
+        self._snapshot = (0, value, fingerprint(value)) # (generación, valor, huella)
+        self._fetched_at = clock()
+
+    def generation(self) -> int:
+        self._refresh_if_stale()
+        return self._snapshot[0]
+
+    def get(self) -> Any:
+        self._refresh_if_stale()
+        return self._snapshot[1]
+
+    def _refresh_if_stale(self) -> None:
+        if self._clock() - self._fetched_at >= self._ttl:
+            self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        if self._background:
+            threading.Thread(target=self._refresh, daemon=True).start()
+        else:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            tag = self._source_version() if self._source_version else None
+            if tag is None or tag != self._tag:
+                value = self._fetch()
+                generation, _, fingerprint = self._snapshot
+                new_fingerprint = self._fingerprint(value)
+                if new_fingerprint != fingerprint:
+                    self._snapshot = (generation + 1, value, new_fingerprint)
+                self._tag = tag
+        except Exception as e: # La fuente falló: se siguen sirviendo los datos anteriores
+            self._logger.error(f"No se pudo refrescar la caché de {self._name}, se mantienen los datos anteriores: {e}")
+        finally:
+            self._fetched_at = self._clock()
+            self._refreshing = False
+
+
+def _rules_fingerprint(rules: Sequence[Rule]) -> tuple[tuple[Any, ...], ...]:
+    return tuple((rule.id, rule.condition, getattr(rule, "description", None)) for rule in rules)
+
+
+class CachingRuleSource:
+    """
+    Decorador de `RuleSource` que cachea las reglas durante `ttl` segundos y las refresca en
+    segundo plano, así que `get_rules` nunca espera a la fuente (salvo la carga inicial, que
+    ocurre al construirlo). Si la fuente implementa `VersionedSource`, el refresco solo descarga
+    las reglas cuando su versión cambia. `get_version` cambia únicamente cuando cambia el
+    contenido, lo que permite a `RuleProcessor` no recompilar las reglas en cada llamada.
+    """
+
+    def __init__(
+        self,
+        source: RuleSource,
+        ttl: float = 60.0,
+        background: bool = True,
+        logger: Logger | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._cache = _CachedFetch(
+            "reglas",
+            lambda: tuple(source.get_rules()),
+            _rules_fingerprint,
+            source.get_version if isinstance(source, VersionedSource) else None,
+            ttl, background, logger or _NullLogger(), clock,
+        )
+
+    def get_rules(self) -> Iterable[Rule]:
+        return self._cache.get()
+
+    def get_version(self) -> Hashable:
+        return self._cache.generation()
+
+
+class CachingConfigSource:
+    """Decorador de `ConfigSource` equivalente a `CachingRuleSource`."""
+
+    def __init__(
+        self,
+        source: ConfigSource,
+        ttl: float = 60.0,
+        background: bool = True,
+        logger: Logger | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._cache = _CachedFetch(
+            "configuración",
+            source.get_config,
+            dict, # Copia superficial: detecta también cambios hechos sobre el mismo dict
+            source.get_version if isinstance(source, VersionedSource) else None,
+            ttl, background, logger or _NullLogger(), clock,
+        )
+
+    def get_config(self) -> dict[str, Any]:
+        return self._cache.get()
+
+    def get_version(self) -> Hashable:
+        return self._cache.generation()
+
 # ---------------------------------------------------------------------------
 # RuleProcessor Refactorizado
 # ---------------------------------------------------------------------------
@@ -139,11 +577,35 @@ class RuleProcessor:
         config_source: ConfigSource,
         evaluator: ConditionEvaluator, # Hacerlo no opcional, inyectar SafeConditionEvaluator por defecto si se desea fuera
         logger: Logger | None = None,  # Logger sigue siendo opcional, con fallback a NullLogger
+        adaptive: bool = False,
+        reorder_every: int = 1000,
+        indexed: bool = False,
     ) -> None:
+        """
+        Con `adaptive=True` se mide, por regla, cuántas veces se evalúa, cuántas cumple y cuánto
+        tarda, y cada `reorder_every` elementos se reordenan las reglas para evaluar antes las
+        baratas y que más cumplen. Como basta con que cumpla una regla, el orden no cambia qué
+        elementos pasan; solo cuál regla se reporta en el log detallado.
+
+        Con `indexed=True` las reglas se analizan en un `RuleIndex`, de modo que las de igualdad,
+        rango y `has_key` se resuelven con búsquedas en índices en lugar de evaluarse una a una.
+
+        Throws:
+            ValueError: Si se piden a la vez los modos adaptativo e indexado.
+        """
+        if adaptive and indexed:
+            raise ValueError("Los modos adaptativo e indexado no se pueden combinar.")
         self._rule_source = rule_source
         self._config_source = config_source # Guardar la fuente, no solo el config, por si es dinámico
         self._evaluator = evaluator
         self._logger = logger or _NullLogger() # Late binding para el logger
+        self._adaptive = adaptive
+        self._reorder_every = reorder_every
+        self._indexed = indexed
+        # Reglas compiladas de la última versión vista de una fuente versionada, y su índice
+        self._compiled_memo: tuple[Hashable, list[tuple[Rule, Predicate]]] | None = None
+        self._index_memo: tuple[list[tuple[Rule, Predicate]], RuleIndex] | None = None
+        self._rule_counters: dict[str, _RuleCounter] = {} # Se conservan entre llamadas, por id de regla
 
         # Configuración podría ser cargada aquí o bajo demanda en process_rules si es dinámica
         # self._config = self._config_source.get_config()
@@ -159,6 +621,7 @@ class RuleProcessor:
         """
         self._logger.info(f"Cambiando ConditionEvaluator a: {type(evaluator).__name__}")
         self._evaluator = evaluator
+        self._compiled_memo = self._index_memo = None # Los predicados dependen del evaluador
 
     def set_logger(self, logger: Logger) -> None:
         """Permite cambiar el logger en tiempo de ejecución."""
@@ -174,32 +637,616 @@ class RuleProcessor:
         Retorna una lista de elementos que satisfacen *al menos una* regla.
         """
         current_config = self._config_source.get_config() # Obtener config fresca por si es dinámica
-        rules = list(self._rule_source.get_rules()) # Obtener reglas frescas
+        compiled_rules = self._load_rules() # Reglas frescas, cada condición interpretada una sola vez
 
-        self._logger.info(f"Procesando datos con {len(rules)} reglas y config: {current_config.get('version', 'N/A')}")
+        self._logger.info(f"Procesando datos con {len(compiled_rules)} reglas y config: {current_config.get('version', 'N/A')}")
         
+        passed_items = list(self._iter_passing(
+            data,
+            compiled_rules,
+            current_config,
+            on_failure=lambda item: self._logger.error(f"FALLO DE VALIDACIÓN REFACTORIZADO para el elemento: {item}"),
+            on_skip=lambda item_index, item: self._logger.warning(f"Elemento en índice {item_index} no es un diccionario, saltando: {item}"),
+        ))
+        
+        self._logger.info(f"Procesamiento refactorizado completado. {len(passed_items)} elementos válidos.")
+        return passed_items
+
+    def iter_process_rules(
+        self,
+        data: Iterable[Any],
+        failure_sink: Callable[[dict[str, Any]], None] | None = None,
+        log_interval: float = 10.0,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Versión en streaming de `process_rules`: produce los elementos que satisfacen *al menos una*
+        regla a medida que se consumen de `data`, que puede ser cualquier iterable (incluso infinito).
+        Nada se acumula, así que la memoria es constante.
+
+        Cada elemento que falla se entrega a `failure_sink`, si se indica. En el log solo aparecen
+        conteos agregados de fallos y de elementos saltados, como mucho uno cada `log_interval`
+        segundos, más uno final al agotarse o cerrarse el generador.
+        """
+        current_config = self._config_source.get_config()
+        compiled_rules = self._load_rules()
+        self._logger.info(f"Procesando stream con {len(compiled_rules)} reglas y config: {current_config.get('version', 'N/A')}")
+        counter = _FailureCounter(self._logger, log_interval)
+
+        def on_failure(item: dict[str, Any]) -> None:
+            if failure_sink is not None:
+                failure_sink(item)
+            counter.record_failure()
+
+        passed = 0
+        try:
+            for item in self._iter_passing(data, compiled_rules, current_config, on_failure, counter.record_skip):
+                passed += 1
+                yield item
+        finally:
+            counter.flush()
+            self._logger.info(
+                f"Procesamiento en streaming completado. {passed} elementos válidos, "
+                f"{counter.total_failed} fallidos, {counter.total_skipped} saltados."
+            )
+
+    def _iter_passing(
+        self,
+        data: Iterable[Any],
+        compiled_rules: list[tuple[Rule, Predicate]],
+        current_config: dict[str, Any],
+        on_failure: Callable[[dict[str, Any]], None],
+        on_skip: Callable[[int, Any], None],
+    ) -> Iterator[dict[str, Any]]:
+        """Recorrido común de `process_rules` e `iter_process_rules`; solo cambia cómo se reportan los fallos."""
+        detailed_logging = current_config.get("enable_detailed_logging_refactored", False)
+        if self._adaptive:
+            first_match = self._adaptive_matcher(compiled_rules)
+        elif self._indexed:
+            first_match = self._rule_index(compiled_rules).first_match
+        else:
+            first_match = partial(_first_match, compiled_rules)
+
+        for item_index, item in enumerate(data):
+            if not isinstance(item, dict):
+                on_skip(item_index, item)
+                continue
+
+            rule = first_match(item)
+            if rule is None:
+                on_failure(item)
+                continue
+            if detailed_logging:
+                self._logger.info(f"Elemento {item} PASÓ la regla {rule.id}: {getattr(rule, 'description', 'N/A')}")
+            yield item
+
+    def _adaptive_matcher(self, compiled_rules: list[tuple[Rule, Predicate]]) -> Callable[[dict[str, Any]], Rule | None]:
+        """Como `_first_match`, pero midiendo cada evaluación y reordenando las reglas periódicamente."""
+        entries = [
+            (rule, predicate, self._rule_counters.setdefault(rule.id, _RuleCounter()))
+            for rule, predicate in compiled_rules
+        ]
+        entries.sort(key=_evaluation_rank)
+        reorder_every = self._reorder_every
+        clock = time.perf_counter_ns
+        seen = 0
+
+        def match(item: dict[str, Any]) -> Rule | None:
+            nonlocal seen
+            seen += 1
+            if seen % reorder_every == 0:
+                entries.sort(key=_evaluation_rank)
+            if seen % _COST_SAMPLE_EVERY:
+                for rule, predicate, counter in entries:
+                    counter.evaluations += 1
+                    if predicate(item):
+                        counter.hits += 1
+                        return rule
+                return None
+            # Solo una fracción de los elementos se cronometra: medir cada llamada costaría más que evaluarla
+            for rule, predicate, counter in entries:
+                start = clock()
+                passed = predicate(item)
+                counter.nanoseconds += clock() - start
+                counter.timed += 1
+                counter.evaluations += 1
+                if passed:
+                    counter.hits += 1
+                    return rule
+            return None
+        return match
+
+    def rule_stats(self) -> list[RuleStats]:
+        """
+        Estadísticas acumuladas del modo adaptativo, en el orden en que se evaluarían las reglas.
+        Vacío si el procesador no es adaptativo o aún no procesó datos.
+        """
+        ranked = sorted(self._rule_counters.items(), key=lambda entry: _evaluation_rank((None, None, entry[1])))
+        return [
+            RuleStats(rule_id, counter.evaluations, counter.hits, _mean_cost_ns(counter) / 1e9)
+            for rule_id, counter in ranked
+        ]
+
+    def reset_rule_stats(self) -> None:
+        """Olvida las estadísticas acumuladas; el orden se vuelve a aprender desde cero."""
+        self._rule_counters.clear()
+
+    def process_columns(self, batch: Any) -> Any:
+        """
+        Variante columnar de `process_rules` para lotes grandes. `batch` es un DataFrame de pandas
+        o un dict de columnas (arrays de NumPy o secuencias de igual longitud). Cada regla se
+        evalúa como una máscara vectorizada y las máscaras se combinan con OR.
+        Retorna las filas que cumplen *al menos una* regla, con el mismo tipo que `batch`
+        (un dict de columnas se retorna como dict de arrays; las listas, como arrays de objetos
+        con sus valores originales). Requiere NumPy.
+        """
+        np = _import_numpy()
+        current_config = self._config_source.get_config()
+        compiled_rules = self._load_rules()
+        rules = [rule for rule, _ in compiled_rules]
+        length = _batch_length(batch)
+        self._logger.info(f"Procesando lote columnar de {length} filas con {len(rules)} reglas y config: {current_config.get('version', 'N/A')}")
+
+        if isinstance(self._evaluator, ColumnarConditionEvaluator):
+            masks = (self._evaluator.evaluate_columns(rule.condition, batch, length) for rule in rules)
+        else:
+            # El evaluador no sabe de columnas: se reconstruyen las filas una sola vez
+            columns = _batch_columns(batch)
+            rows = [dict(zip(columns, values)) for values in zip(*columns.values())] if columns else []
+            masks = (
+                np.fromiter((predicate(row) for row in rows), dtype=bool, count=length)
+                for _, predicate in compiled_rules
+            )
+
+        passed = np.zeros(length, dtype=bool)
+        for mask in masks:
+            passed |= mask
+            if passed.all():
+                break
+
+        failed = length - int(passed.sum())
+        if failed:
+            self._logger.error(f"FALLO DE VALIDACIÓN REFACTORIZADO para {failed} filas del lote columnar.")
+        self._logger.info(f"Procesamiento columnar completado. {length - failed} filas válidas.")
+        if hasattr(batch, "columns"):
+            return batch[passed]
+        return {name: column[passed] for name, column in _batch_columns(batch).items()}
+
+    def _load_rules(self) -> list[tuple[Rule, Predicate]]:
+        """
+        Reglas de la fuente con sus predicados. Si la fuente es versionada, las reglas compiladas
+        se reutilizan mientras su versión no cambie.
+        """
+        if not isinstance(self._rule_source, VersionedSource):
+            return self._compile_rules(list(self._rule_source.get_rules()))
+        version = self._rule_source.get_version()
+        if self._compiled_memo is None or self._compiled_memo[0] != version:
+            self._compiled_memo = (version, self._compile_rules(list(self._rule_source.get_rules())))
+        return self._compiled_memo[1]
+
+    def _rule_index(self, compiled_rules: list[tuple[Rule, Predicate]]) -> RuleIndex:
+        """`RuleIndex` de las reglas compiladas; se reconstruye solo cuando estas cambian."""
+        if self._index_memo is None or self._index_memo[0] is not compiled_rules:
+            self._index_memo = (compiled_rules, RuleIndex(compiled_rules, self._evaluator))
+        return self._index_memo[1]
+
+    def _compile_rules(self, rules: list[Rule]) -> list[tuple[Rule, Predicate]]:
+        """Asocia cada regla con su predicado."""
+        predicates = _compile_conditions(self._evaluator, [rule.condition for rule in rules])
+        return list(zip(rules, predicates))
+
+
+# ---------------------------------------------------------------------------
+# Índices de reglas para conjuntos grandes de reglas
+# ---------------------------------------------------------------------------
+
+class _FieldIndex:
+    """Reglas indexadas de un mismo campo. Cada estructura guarda el menor índice de regla que cumple."""
+
+    def __init__(self) -> None:
+        self.present = _NO_MATCH # has_key
+        self.equal: dict[Any, int] = {} # `== <entero>`: valor -> regla
+        self.equal_text: dict[str, int] = {} # `== <cadena>`: str(valor) -> regla
+        self.greater: list[tuple[int, int]] = [] # `> umbral`: (umbral, regla)
+        self.less: list[tuple[int, int]] = [] # `< umbral`: (umbral, regla)
+        self.range_predicates: list[tuple[int, Predicate]] = [] # Para valores no numéricos
+
+    def freeze(self) -> None:
+        """Ordena los umbrales y precalcula el menor índice de regla de cada prefijo/sufijo."""
+        self.greater.sort()
+        self.greater_thresholds = [threshold for threshold, _ in self.greater]
+        self.greater_prefix_min = list(accumulate((rule_index for _, rule_index in self.greater), min))
+        self.less.sort()
+        self.less_thresholds = [threshold for threshold, _ in self.less]
+        self.less_suffix_min = list(accumulate((rule_index for _, rule_index in reversed(self.less)), min))[::-1]
+        self.range_predicates.sort(key=lambda entry: entry[0])
+
+    def first_match(self, item: dict[str, Any], value: Any, best: int) -> int:
+        """Menor índice de regla de este campo que cumple `item`, si es menor que `best`."""
+        best = min(best, self.present)
+        if self.equal:
+            try:
+                best = min(best, self.equal.get(value, _NO_MATCH))
+            except TypeError: # Valor no hashable (lista, dict): nunca es igual a un entero
+                pass
+        if self.equal_text:
+            try:
+                best = min(best, self.equal_text.get(str(value), _NO_MATCH))
+            except Exception:
+                pass
+        if not self.range_predicates:
+            return best
+
+        if isinstance(value, (int, float)) and value == value: # Excluye NaN, que no se puede ordenar
+            # `value > t` para los umbrales t del prefijo; `value < t` para los del sufijo
+            cut = bisect_left(self.greater_thresholds, value)
+            if cut:
+                best = min(best, self.greater_prefix_min[cut - 1])
+            cut = bisect_right(self.less_thresholds, value)
+            if cut < len(self.less_suffix_min):
+                best = min(best, self.less_suffix_min[cut])
+            return best
+        # Otros tipos: las reglas de rango se evalúan en orden, igual que sin índice
+        for rule_index, predicate in self.range_predicates:
+            if rule_index >= best:
+                break
+            if predicate(item):
+                return rule_index
+        return best
+
+
+# Índice "sin coincidencia": mayor que cualquier índice de regla
+_NO_MATCH = sys.maxsize
+
+class RuleIndex:
+    """
+    Análisis de un conjunto de reglas para la semántica "cumple al menos una".
+
+    Las reglas `==` se agrupan en tablas hash por (campo, valor), las de `>`/`<` en umbrales
+    ordenados por campo (un bisect responde todas las de un campo) y las de `has_key` por campo.
+    Por elemento basta un sondeo por campo indexado; solo las demás reglas (p. ej. `contains`)
+    se evalúan una a una, y solo las anteriores a la mejor coincidencia hallada. `first_match`
+    retorna la misma regla que la evaluación secuencial en orden.
+
+    Solo se indexan condiciones de `SafeConditionEvaluator`, cuya semántica reproduce el índice;
+    con otros evaluadores todas las reglas se evalúan en orden.
+    """
+
+    def __init__(self, compiled_rules: list[tuple[Rule, Predicate]], evaluator: ConditionEvaluator):
+        self._rules = [rule for rule, _ in compiled_rules]
+        self._fields: dict[str, _FieldIndex] = {}
+        self._others: list[tuple[int, Predicate]] = []
+        parse = evaluator.parse if isinstance(evaluator, SafeConditionEvaluator) else None
+
+        for rule_index, (rule, predicate) in enumerate(compiled_rules):
+            if parse is None:
+                self._others.append((rule_index, predicate))
+                continue
+            parsed = parse(rule.condition)
+            if parsed is None:
+                continue # Malformada: nunca se cumple
+            field, operator, operand = parsed
+            if operator == "contains" or (operator in (">", "<") and isinstance(operand, str)):
+                self._others.append((rule_index, predicate))
+                continue
+
+            field_index = self._fields.setdefault(field, _FieldIndex())
+            if operator == "has_key":
+                field_index.present = min(field_index.present, rule_index)
+            elif operator == "==":
+                if isinstance(operand, int):
+                    field_index.equal.setdefault(operand, rule_index)
+                elif isinstance(operand, str):
+                    field_index.equal_text.setdefault(operand, rule_index)
+            elif isinstance(operand, int): # `>`/`<` con umbral entero (los literales no enteros ya van a _others)
+                threshold: int = operand
+                (field_index.greater if operator == ">" else field_index.less).append((threshold, rule_index))
+                field_index.range_predicates.append((rule_index, predicate))
+
+        for field_index in self._fields.values():
+            field_index.freeze()
+
+    def first_match(self, item: dict[str, Any]) -> Rule | None:
+        """Primera regla (en el orden original) que cumple `item`, o None si no cumple ninguna."""
+        best = _NO_MATCH
+        fields = self._fields
+        # Se recorren los campos del item: su número no depende de cuántas reglas haya
+        for field, value in item.items():
+            field_index = fields.get(field)
+            if field_index is not None:
+                best = field_index.first_match(item, value, best)
+        for rule_index, predicate in self._others:
+            if rule_index >= best:
+                break
+            if predicate(item):
+                best = rule_index
+                break
+        return self._rules[best] if best != _NO_MATCH else None
+
+
+# ---------------------------------------------------------------------------
+# Ejecución en paralelo con un pool de procesos
+# ---------------------------------------------------------------------------
+
+class ParallelRuleProcessor(RuleProcessor):
+    """
+    `RuleProcessor` que reparte los elementos en bloques entre varios procesos, para no quedar
+    limitado a un núcleo por el GIL. El resultado (y su orden) es el mismo que el de `RuleProcessor`.
+
+    Las reglas se compilan en el proceso principal y el evaluador, con sus condiciones ya
+    interpretadas, viaja una sola vez a cada worker al crearlo; por cada bloque solo se envían
+    los elementos y vuelve, por elemento, el índice de la primera regla que cumple.
+    """
+
+    def __init__(
+        self,
+        rule_source: RuleSource,
+        config_source: ConfigSource,
+        evaluator: ConditionEvaluator, # Debe poder serializarse con pickle
+        logger: Logger | None = None,
+        workers: int | None = None,
+        chunk_size: int = 10_000,
+    ) -> None:
+        super().__init__(rule_source, config_source, evaluator, logger)
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+
+    def process_rules(self, data: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Retorna una lista de elementos que satisfacen *al menos una* regla, evaluando en paralelo.
+        Los errores de evaluación dentro de los workers no llegan al logger del proceso principal.
+        """
+        current_config = self._config_source.get_config()
+        rules = [rule for rule, _ in self._load_rules()] # Interpreta las condiciones aquí, antes de enviar el evaluador
+        self._logger.info(f"Procesando datos en {self._workers} procesos con {len(rules)} reglas y config: {current_config.get('version', 'N/A')}")
+        detailed_logging = current_config.get("enable_detailed_logging_refactored", False)
+
         passed_items: list[dict[str, Any]] = []
+        with ProcessPoolExecutor(
+            max_workers=self._workers,
+            initializer=_init_rule_worker,
+            initargs=(self._evaluator, [rule.condition for rule in rules]),
+        ) as executor:
+            for chunk, matches in self._map_chunks(executor, data):
+                for item, rule_index in zip(chunk, matches):
+                    if rule_index < 0:
+                        self._logger.error(f"FALLO DE VALIDACIÓN REFACTORIZADO para el elemento: {item}")
+                        continue
+                    if detailed_logging:
+                        rule = rules[rule_index]
+                        self._logger.info(f"Elemento {item} PASÓ la regla {rule.id}: {getattr(rule, 'description', 'N/A')}")
+                    passed_items.append(item)
+
+        self._logger.info(f"Procesamiento paralelo completado. {len(passed_items)} elementos válidos.")
+        return passed_items
+
+    def _chunks(self, data: Iterable[Any]) -> Iterator[list[dict[str, Any]]]:
+        chunk: list[dict[str, Any]] = []
         for item_index, item in enumerate(data):
             if not isinstance(item, dict):
                 self._logger.warning(f"Elemento en índice {item_index} no es un diccionario, saltando: {item}")
                 continue
+            chunk.append(item)
+            if len(chunk) == self._chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
-            passed_at_least_one_rule = False
-            for rule in rules:
-                if self._evaluator.evaluate(rule.condition, item):
-                    passed_at_least_one_rule = True
-                    if current_config.get("enable_detailed_logging_refactored", False):
-                        self._logger.info(f"Elemento {item} PASÓ la regla {rule.id}: {getattr(rule, 'description', 'N/A')}")
-                    break # Pasa al siguiente item
+    def _map_chunks(self, executor: ProcessPoolExecutor, data: Iterable[Any]) -> Iterator[tuple[list[dict[str, Any]], list[int]]]:
+        """
+        Como `executor.map`, pero con un número acotado de bloques en vuelo: la entrada se consume
+        a medida que los workers avanzan y los resultados salen en el orden original.
+        """
+        pending: deque[tuple[list[dict[str, Any]], Future]] = deque()
+        for chunk in self._chunks(data):
+            pending.append((chunk, executor.submit(_match_chunk, chunk)))
+            if len(pending) >= 2 * self._workers:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
 
-            if passed_at_least_one_rule:
-                passed_items.append(item)
-            else:
-                self._logger.error(f"FALLO DE VALIDACIÓN REFACTORIZADO para el elemento: {item}")
-        
-        self._logger.info(f"Procesamiento refactorizado completado. {len(passed_items)} elementos válidos.")
+
+def _first_match(compiled_rules: list[tuple[Rule, Predicate]], item: dict[str, Any]) -> Rule | None:
+    """Primera regla que cumple `item`, o None si no cumple ninguna."""
+    for rule, predicate in compiled_rules:
+        if predicate(item):
+            return rule
+    return None
+
+def _evaluation_rank(entry: tuple[Any, Any, _RuleCounter]) -> float:
+    """
+    Prioridad de una regla en una evaluación con cortocircuito: costo medio dividido por la
+    probabilidad de cumplirse (suavizada). Las reglas aún no evaluadas van primero.
+    """
+    counter = entry[2]
+    if not counter.evaluations:
+        return 0.0
+    hit_rate = (counter.hits + 1) / (counter.evaluations + 2)
+    return _mean_cost_ns(counter) / hit_rate
+
+def _mean_cost_ns(counter: _RuleCounter) -> float:
+    # Sin muestras de tiempo todavía, todas las reglas se consideran igual de caras
+    return counter.nanoseconds / counter.timed if counter.timed else 1.0
+
+# ---------------------------------------------------------------------------
+# RuleProcessor asíncrono
+# ---------------------------------------------------------------------------
+
+async def _await_if_needed(result: Any) -> Any:
+    # Una fuente asíncrona puede no ser `async def` y retornar un Future u otra corrutina
+    return await result if inspect.isawaitable(result) else result
+
+
+def _list_unless_awaitable(method: Callable[[], Any]) -> Any:
+    result = method()
+    return result if inspect.isawaitable(result) else list(result)
+
+class _SourceSnapshot:
+    """
+    Últimas reglas y configuración obtenidas por `AsyncRuleProcessor`, expuestas como fuentes
+    síncronas. Su versión solo cambia si las reglas cambian, así que no se recompilan en cada llamada.
+    """
+    def __init__(self) -> None:
+        self._rules: list[Rule] = []
+        self._fingerprint: tuple[tuple[Any, ...], ...] = ()
+        self._version = 0
+        self._config: dict[str, Any] = {}
+
+    def update(self, rules: list[Rule], config: dict[str, Any]) -> None:
+        fingerprint = _rules_fingerprint(rules)
+        if fingerprint != self._fingerprint:
+            self._rules, self._fingerprint = rules, fingerprint
+            self._version += 1
+        self._config = config
+
+    def get_rules(self) -> Iterable[Rule]:
+        return self._rules
+
+    def get_config(self) -> dict[str, Any]:
+        return self._config
+
+    def get_version(self) -> Hashable:
+        return self._version
+
+
+class AsyncRuleProcessor:
+    """
+    `RuleProcessor` para pipelines de asyncio. Las fuentes pueden ser asíncronas (`AsyncRuleSource`,
+    `AsyncConfigSource`) o síncronas, que se consultan en el executor para no bloquear el loop;
+    reglas y configuración se piden en paralelo. Los elementos llegan de un iterable o de un
+    iterador asíncrono y se evalúan por lotes de `batch_size` en `executor` (por defecto, el del
+    loop), así el event loop sigue atendiendo otras tareas mientras tanto. El resultado es el
+    mismo que el de `RuleProcessor.process_rules`.
+    """
+
+    def __init__(
+        self,
+        rule_source: AsyncRuleSource | RuleSource,
+        config_source: AsyncConfigSource | ConfigSource,
+        evaluator: ConditionEvaluator,
+        logger: Logger | None = None,
+        executor: Executor | None = None,
+        batch_size: int = 1000,
+    ) -> None:
+        self._rule_source = rule_source
+        self._config_source = config_source
+        self._logger = logger or _NullLogger()
+        self._executor = executor
+        self._batch_size = batch_size
+        # La evaluación se delega en un RuleProcessor síncrono alimentado con lo último obtenido
+        self._snapshot = _SourceSnapshot()
+        self._processor = RuleProcessor(self._snapshot, self._snapshot, evaluator, self._logger)
+
+    async def process_rules(self, data: Iterable[Any] | AsyncIterable[Any]) -> list[dict[str, Any]]:
+        """Retorna una lista de elementos que satisfacen *al menos una* regla."""
+        passed_items = [item async for item in self.iter_process_rules(data)]
+        self._logger.info(f"Procesamiento asíncrono completado. {len(passed_items)} elementos válidos.")
         return passed_items
 
+    async def iter_process_rules(self, data: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[dict[str, Any]]:
+        """Produce los elementos que satisfacen *al menos una* regla, lote a lote y en el orden de entrada."""
+        current_config, rules = await asyncio.gather(self._fetch_config(), self._fetch_rules())
+        self._snapshot.update(rules, current_config)
+        compiled_rules = self._processor._load_rules()
+        self._logger.info(f"Procesando datos asíncronos con {len(compiled_rules)} reglas y config: {current_config.get('version', 'N/A')}")
+
+        loop = asyncio.get_running_loop()
+        offset = 0
+        async for batch in self._batches(data):
+            passed = await loop.run_in_executor(
+                self._executor, self._evaluate_batch, batch, offset, compiled_rules, current_config,
+            )
+            offset += len(batch)
+            for item in passed:
+                yield item
+
+    async def _fetch_rules(self) -> list[Rule]:
+        get_rules = self._rule_source.get_rules
+        if inspect.iscoroutinefunction(get_rules):
+            rules = await _await_if_needed(get_rules())
+        else:
+            # Las reglas de una fuente síncrona pueden ser perezosas: se materializan también en el executor
+            rules = await _await_if_needed(await self._run_in_executor(partial(_list_unless_awaitable, get_rules)))
+        return list(rules)
+
+    async def _fetch_config(self) -> dict[str, Any]:
+        get_config = self._config_source.get_config
+        if inspect.iscoroutinefunction(get_config):
+            config: dict[str, Any] = await _await_if_needed(get_config())
+        else:
+            config = await _await_if_needed(await self._run_in_executor(get_config))
+        return config
+
+    async def _run_in_executor(self, method: Callable[[], Any]) -> Any:
+        # Fuente síncrona: puede bloquear (red, disco), así que se consulta fuera del loop
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method)
+
+    async def _batches(self, data: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[list[Any]]:
+        batch: list[Any] = []
+        if isinstance(data, AsyncIterable):
+            async for item in data:
+                batch.append(item)
+                if len(batch) == self._batch_size:
+                    yield batch
+                    batch = []
+        else:
+            for item in data:
+                batch.append(item)
+                if len(batch) == self._batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _evaluate_batch(
+        self,
+        batch: list[Any],
+        offset: int,
+        compiled_rules: list[tuple[Rule, Predicate]],
+        current_config: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Se ejecuta en el executor: mismo recorrido y mismos mensajes que `RuleProcessor.process_rules`."""
+        logger = self._logger
+        return list(self._processor._iter_passing(
+            batch,
+            compiled_rules,
+            current_config,
+            on_failure=lambda item: logger.error(f"FALLO DE VALIDACIÓN REFACTORIZADO para el elemento: {item}"),
+            on_skip=lambda item_index, item: logger.warning(f"Elemento en índice {offset + item_index} no es un diccionario, saltando: {item}"),
+        ))
+
+
+def _compile_conditions(evaluator: ConditionEvaluator, conditions: list[str]) -> list[Predicate]:
+    """
+    Predicado de cada condición. Si el evaluador no sabe compilar,
+    el predicado simplemente delega en `evaluate`.
+    """
+    if isinstance(evaluator, ConditionCompiler):
+        return [evaluator.compile(condition) for condition in conditions]
+    return [partial(evaluator.evaluate, condition) for condition in conditions]
+
+
+# Predicados del proceso worker actual, preparados una sola vez por `_init_rule_worker`
+_worker_predicates: list[Predicate] = []
+
+def _init_rule_worker(evaluator: ConditionEvaluator, conditions: list[str]) -> None:
+    global _worker_predicates
+    _worker_predicates = _compile_conditions(evaluator, conditions)
+
+def _match_chunk(chunk: list[dict[str, Any]]) -> list[int]:
+    """Índice de la primera regla que cumple cada elemento del bloque, o -1 si no cumple ninguna."""
+    matches = []
+    for item in chunk:
+        for rule_index, predicate in enumerate(_worker_predicates):
+            if predicate(item):
+                matches.append(rule_index)
+                break
+        else:
+            matches.append(-1)
+    return matches
+
 # Ejemplo de una clase de regla concreta si no se usa SimpleNamespace o dicts directamente
 # from dataclasses import dataclass
 # @dataclass